@@ -0,0 +1,220 @@
+"""
+Admission control and load shedding for the web server.
+
+Each route class (clicks, game starts, reads) has its own concurrency limit,
+bounded wait queue and latency budget, and all of them share a pool of
+worker slots. When a slot frees up it goes to the highest-priority waiter,
+so clicks from games in progress are served before new games and
+leaderboard reads. Requests that would wait longer than their budget are
+rejected straight away with 503 and a Retry-After header instead of piling
+up behind a slow database.
+"""
+
+import functools
+import itertools
+import math
+import threading
+import time
+from typing import Dict, List
+
+from flask import jsonify
+
+
+class RouteClass:
+    """Limits and running metrics for one class of routes."""
+    
+    def __init__(self, name: str, priority: int, max_concurrent: int,
+                 max_queue: int, max_wait: float):
+        self.name = name
+        self.priority = priority  # lower runs first
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait  # latency budget for time spent queued
+        
+        self.in_flight = 0
+        self.queued = 0
+        self.service_time = 0.0  # moving average of seconds per request
+        
+        self.admitted = 0
+        self.shed = {'queue_full': 0, 'over_budget': 0, 'timeout': 0}
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+    
+    def estimated_wait(self) -> float:
+        """Rough time a new arrival would spend queued."""
+        return (self.queued + 1) * self.service_time / self.max_concurrent
+    
+    def to_dict(self) -> dict:
+        """Convert the metrics to a dictionary for JSON serialization."""
+        return {
+            'priority': self.priority,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'admitted': self.admitted,
+            'shed': dict(self.shed),
+            'shed_total': sum(self.shed.values()),
+            'queue_time_avg_ms': round(1000 * self.queue_time_total / self.admitted, 2) if self.admitted else 0.0,
+            'queue_time_max_ms': round(1000 * self.queue_time_max, 2),
+            'service_time_avg_ms': round(1000 * self.service_time, 2)
+        }
+
+
+class _Waiter:
+    __slots__ = ('route', 'seq', 'granted')
+    
+    def __init__(self, route: RouteClass, seq: int):
+        self.route = route
+        self.seq = seq
+        self.granted = False
+
+
+class Rejected(Exception):
+    """Raised when a request is shed."""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Shares a pool of worker slots between route classes by priority."""
+    
+    def __init__(self, total_slots: int = 32, enabled: bool = True):
+        self.total_slots = total_slots
+        self.enabled = enabled
+        self.in_flight = 0
+        self.routes: Dict[str, RouteClass] = {}
+        self.waiters: List[_Waiter] = []
+        self.cond = threading.Condition()
+        self.seq = itertools.count()
+    
+    def add_route(self, name: str, priority: int, max_concurrent: int,
+                  max_queue: int, max_wait: float) -> RouteClass:
+        """Register a route class."""
+        route = RouteClass(name, priority, max_concurrent, max_queue, max_wait)
+        self.routes[name] = route
+        return route
+    
+    def _can_run(self, route: RouteClass) -> bool:
+        return self.in_flight < self.total_slots and route.in_flight < route.max_concurrent
+    
+    def _start(self, route: RouteClass, queued_for: float):
+        self.in_flight += 1
+        route.in_flight += 1
+        route.admitted += 1
+        route.queue_time_total += queued_for
+        route.queue_time_max = max(route.queue_time_max, queued_for)
+    
+    def _dispatch(self):
+        """Hand free slots to waiters, highest priority first."""
+        self.waiters.sort(key=lambda w: (w.route.priority, w.seq))
+        for waiter in list(self.waiters):
+            if self.in_flight >= self.total_slots:
+                break
+            if waiter.route.in_flight < waiter.route.max_concurrent:
+                self.waiters.remove(waiter)
+                waiter.route.queued -= 1
+                waiter.granted = True
+                # Reserve the slot now so later waiters see it as taken
+                self.in_flight += 1
+                waiter.route.in_flight += 1
+        self.cond.notify_all()
+    
+    def _retry_after(self, route: RouteClass) -> int:
+        return max(1, math.ceil(route.estimated_wait()))
+    
+    def acquire(self, name: str) -> float:
+        """
+        Wait for a slot for a request of the given route class.
+        
+        Returns:
+            Seconds spent queued
+            
+        Raises:
+            Rejected: If the request is shed
+        """
+        route = self.routes[name]
+        arrived = time.perf_counter()
+        
+        with self.cond:
+            # Run immediately if nothing of equal or higher priority is waiting
+            ahead = any(w.route.priority <= route.priority for w in self.waiters)
+            if not ahead and self._can_run(route):
+                self._start(route, 0.0)
+                return 0.0
+            
+            if route.queued >= route.max_queue:
+                route.shed['queue_full'] += 1
+                raise Rejected('queue_full', self._retry_after(route))
+            if route.estimated_wait() > route.max_wait:
+                route.shed['over_budget'] += 1
+                raise Rejected('over_budget', self._retry_after(route))
+            
+            waiter = _Waiter(route, next(self.seq))
+            self.waiters.append(waiter)
+            route.queued += 1
+            deadline = arrived + route.max_wait
+            
+            # A slot may be free for this route even though others are waiting
+            self._dispatch()
+            
+            while not waiter.granted:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.waiters.remove(waiter)
+                    route.queued -= 1
+                    route.shed['timeout'] += 1
+                    raise Rejected('timeout', self._retry_after(route))
+                self.cond.wait(remaining)
+            
+            # _dispatch already reserved the slot; record the admission
+            queued_for = time.perf_counter() - arrived
+            self.in_flight -= 1
+            route.in_flight -= 1
+            self._start(route, queued_for)
+            return queued_for
+    
+    def release(self, name: str, service_time: float):
+        """Free a slot after a request finishes."""
+        route = self.routes[name]
+        with self.cond:
+            self.in_flight -= 1
+            route.in_flight -= 1
+            # Exponential moving average of how long requests hold a slot
+            if route.service_time:
+                route.service_time += 0.1 * (service_time - route.service_time)
+            else:
+                route.service_time = service_time
+            if self.waiters:
+                self._dispatch()
+    
+    def limit(self, name: str):
+        """Decorator applying admission control to a Flask view."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                try:
+                    self.acquire(name)
+                except Rejected as exc:
+                    response = jsonify({'error': 'Server busy, please retry', 'reason': exc.reason})
+                    return response, 503, {'Retry-After': str(exc.retry_after)}
+                started = time.perf_counter()
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+    
+    def metrics(self) -> dict:
+        """Get per-route admission metrics."""
+        with self.cond:
+            return {
+                'enabled': self.enabled,
+                'total_slots': self.total_slots,
+                'in_flight': self.in_flight,
+                'routes': {name: route.to_dict() for name, route in self.routes.items()}
+            }
@@ -0,0 +1,131 @@
+"""
+Per-query overhead benchmark for the leaderboard and insert paths.
+
+Runs the same GameDatabase calls twice: once opening a new connection and
+sending the statement text on every call (how queries used to run), and
+once with pooled connections, which reuse SQLite's statement cache and
+PostgreSQL prepared statements.
+
+Seeds and queries a scratch SQLite file. With --postgres it uses the
+database in DATABASE_URL instead, inside a temporary schema that is dropped
+afterwards, so benchmark rows never reach the real tables or leaderboards.
+
+    python bench_queries.py --rows 20000 --calls 2000
+    DATABASE_URL=postgresql://... python bench_queries.py --postgres
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from database import GameDatabase, _load_psycopg2
+
+
+def time_calls(call, calls: int, repeats: int = 5) -> float:
+    """Median microseconds per call over several timed runs."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for i in range(calls):
+            call(i)
+        samples.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(samples)
+
+
+def run(db: GameDatabase, calls: int):
+    """Print per-call cost of each query path, without and with pooling."""
+    paths = {
+        'leaderboard': lambda i: db.get_leaderboard(numbers_count=10, limit=10),
+        'leaderboard page': lambda i: db.get_leaderboard_page(numbers_count=10, limit=10,
+                                                              after=(20.0, i)),
+        'insert': lambda i: db.save_result("bench", 20.0 + i % 100 / 10, 10, True),
+    }
+    modes = {
+        'connect per call': dict(pool_size=0, prepare_statements=False),
+        'pooled + prepared': dict(pool_size=8, prepare_statements=True),
+    }
+    
+    for path, call in paths.items():
+        results = []
+        for settings in modes.values():
+            db._pools = {}
+            db.pool_size = settings['pool_size']
+            db.prepare_statements = settings['prepare_statements']
+            call(0)
+            results.append(time_calls(call, calls))
+        before, after = results
+        print(f"{path:17}  connect per call {before:8.1f} us  "
+              f"pooled + prepared {after:8.1f} us  ({before / after:4.1f}x)")
+
+
+@contextmanager
+def scratch_schema(database_url: str):
+    """
+    Point DATABASE_URL at a new, empty PostgreSQL schema for the duration.
+    
+    The schema and everything created in it are dropped on exit.
+    """
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    schema = f"query_bench_{os.getpid()}"
+    
+    psycopg2 = _load_psycopg2()
+    admin = psycopg2.connect(database_url)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE SCHEMA {schema}")
+    
+    separator = '&' if '?' in database_url else '?'
+    os.environ['DATABASE_URL'] = f"{database_url}{separator}options=-csearch_path%3D{schema}"
+    try:
+        yield
+    finally:
+        os.environ['DATABASE_URL'] = database_url
+        admin.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+
+
+def seed(db: GameDatabase, rows: int):
+    rng = random.Random(0)
+    for i in range(rows):
+        db.save_result(f"seed{i}", rng.uniform(5, 60), rng.choice([5, 10, 15]),
+                       rng.random() < 0.7)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure per-query overhead.")
+    parser.add_argument('--rows', type=int, default=20000, help="results to seed (default: 20000)")
+    parser.add_argument('--calls', type=int, default=2000, help="calls per timed run (default: 2000)")
+    parser.add_argument('--postgres', action='store_true',
+                        help="benchmark DATABASE_URL, in a temporary schema")
+    args = parser.parse_args()
+    
+    # Replica reads would go to the real tables, not the scratch ones
+    os.environ.pop('DATABASE_READ_URLS', None)
+    database_url = os.environ.pop('DATABASE_URL', None)
+    
+    if args.postgres:
+        if not database_url:
+            parser.error("--postgres needs DATABASE_URL")
+        with scratch_schema(database_url):
+            db = GameDatabase()
+            seed(db, args.rows)
+            run(db, args.calls)
+            # Close pooled connections before the schema is dropped
+            for pool in db._pools.values():
+                for conn in pool:
+                    conn.raw.close()
+    else:
+        if database_url:
+            print("Ignoring DATABASE_URL; pass --postgres to benchmark it in a temporary schema")
+        workdir = tempfile.mkdtemp(prefix="query-bench-")
+        try:
+            db = GameDatabase(os.path.join(workdir, "bench.db"))
+            seed(db, args.rows)
+            run(db, args.calls)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,113 @@
+"""
+Local multi-process throughput benchmark for supervisor.py.
+
+Starts the dispatcher with 1 worker and then with N workers (in a scratch
+directory with its own SQLite database), drives it with client processes
+that play 10-circle games as fast as possible, and reports requests and
+games per second.
+
+    python bench_shards.py --workers 4 --clients 8 --seconds 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+from bench_startup import free_port
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def play_games(args):
+    """Client process: play games until the deadline.
+    
+    Returns:
+        Tuple (requests, games)
+    """
+    port, deadline, numbers_count = args
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    requests = games = 0
+    
+    def post(path, body):
+        conn.request('POST', path, json.dumps(body), headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    
+    while time.time() < deadline:
+        status, game = post('/api/game/start', {'player_name': 'bench', 'numbers_count': numbers_count})
+        requests += 1
+        if status != 200:
+            continue
+        for circle in sorted(game['circles'], key=lambda c: c['number']):
+            post('/api/game/click', {'game_id': game['game_id'], 'x': circle['x'], 'y': circle['y']})
+            requests += 1
+        games += 1
+    
+    conn.close()
+    return requests, games
+
+
+def run(workers: int, clients: int, seconds: float, numbers_count: int, workdir: str) -> dict:
+    """Benchmark a dispatcher with the given number of workers."""
+    port = free_port()
+    base_port = free_port()
+    env = dict(os.environ, ADMISSION_CONTROL='false')
+    supervisor = subprocess.Popen(
+        [sys.executable, os.path.join(APP_DIR, 'supervisor.py'), '--workers', str(workers),
+         '--port', str(port), '--worker-base-port', str(base_port)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # Wait for the dispatcher to accept requests
+        while True:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+                conn.request('GET', '/')
+                conn.getresponse().read()
+                conn.close()
+                break
+            except OSError:
+                if supervisor.poll() is not None:
+                    raise RuntimeError("Supervisor exited during startup")
+                time.sleep(0.1)
+        
+        deadline = time.time() + seconds
+        with Pool(clients) as pool:
+            results = pool.map(play_games, [(port, deadline, numbers_count)] * clients)
+        
+        requests = sum(r for r, _ in results)
+        games = sum(g for _, g in results)
+        return {'requests_per_second': requests / seconds, 'games_per_second': games / seconds}
+    finally:
+        supervisor.send_signal(signal.SIGINT)
+        try:
+            supervisor.wait(10)
+        except subprocess.TimeoutExpired:
+            supervisor.kill()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark sharded workers behind the dispatcher.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="workers to compare against 1 (default: CPU count)")
+    parser.add_argument('--clients', type=int, default=8, help="client processes (default: 8)")
+    parser.add_argument('--seconds', type=float, default=10, help="duration per run (default: 10)")
+    parser.add_argument('--circles', type=int, default=10, help="circles per game (default: 10)")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="shard-bench-")
+    try:
+        for workers in sorted({1, args.workers}):
+            result = run(workers, args.clients, args.seconds, args.circles, workdir)
+            print(f"workers={workers:<3} {result['requests_per_second']:8.0f} req/s  "
+                  f"{result['games_per_second']:7.1f} games/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,78 @@
+"""
+Startup-time benchmark: process start to first 200 response.
+
+Starts the web server as a fresh process in a scratch directory (so it
+gets its own SQLite database) and polls until a request succeeds, once
+with LAZY_INIT=false and once with LAZY_INIT=true.
+
+    python bench_startup.py --runs 5 --path /api/leaderboard
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    """Find an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(lazy: bool, path: str, workdir: str,
+                            timeout: float = 30.0) -> float:
+    """Seconds from spawning the server to its first 200 response on path."""
+    port = free_port()
+    env = dict(os.environ, LAZY_INIT='true' if lazy else 'false', PORT=str(port))
+    url = f"http://127.0.0.1:{port}{path}"
+    
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(APP_DIR, 'main.py')],
+        cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"No 200 response from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure time to first 200 response.")
+    parser.add_argument('--runs', type=int, default=5, help="runs per mode (default: 5)")
+    parser.add_argument('--path', default='/', help="path to request (default: /)")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    try:
+        # Create the database once so both modes measure a warm restart
+        time_to_first_response(False, args.path, workdir)
+        
+        for lazy in (False, True):
+            samples = [time_to_first_response(lazy, args.path, workdir) for _ in range(args.runs)]
+            print(f"LAZY_INIT={str(lazy).lower():5}  "
+                  f"median {statistics.median(samples) * 1000:7.1f} ms  "
+                  f"min {min(samples) * 1000:7.1f} ms  "
+                  f"max {max(samples) * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,100 @@
+"""
+In-process fan-out of Server-Sent Events.
+
+Each event is encoded once and handed to every subscriber's bounded queue,
+so the cost of an update doesn't depend on how many clients are listening
+and one slow client can't hold up the others: a subscriber whose queue is
+full is dropped, and its EventSource reconnects and starts afresh.
+"""
+
+import json
+import queue
+import threading
+from typing import Iterator, Optional
+
+
+class Subscription:
+    """One connected client's queue of encoded events."""
+    
+    def __init__(self, buffer_size: int):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+
+class Broadcaster:
+    """Publishes events to every subscribed client."""
+    
+    def __init__(self, buffer_size: int = 64, max_subscribers: int = 1000,
+                 heartbeat_seconds: float = 15.0):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.dropped_total = 0
+    
+    @staticmethod
+    def encode(event: str, data, event_id: Optional[int] = None) -> bytes:
+        """Encode one event in text/event-stream format."""
+        lines = []
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+        return ("\n".join(lines) + "\n\n").encode('utf-8')
+    
+    def subscribe(self) -> Optional[Subscription]:
+        """Register a new client, or return None if there are too many."""
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(self.buffer_size)
+            self.subscribers.add(subscription)
+            return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+    
+    def publish(self, event: str, data, event_id: Optional[int] = None):
+        """Queue an event for every subscriber, dropping any that are full."""
+        message = self.encode(event, data, event_id)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                subscription.dropped = True
+                with self.lock:
+                    if subscription in self.subscribers:
+                        self.subscribers.discard(subscription)
+                        self.dropped_total += 1
+    
+    def stream(self, subscription: Subscription, first: bytes = b"") -> Iterator[bytes]:
+        """
+        Yield a subscriber's events for a streaming response.
+        
+        Sends a comment line as a heartbeat when idle, which is also how a
+        closed connection is noticed. Ends when the subscriber is dropped.
+        
+        Args:
+            subscription: Subscription from subscribe()
+            first: Already encoded event to send before any queued ones
+        """
+        try:
+            if first:
+                yield first
+            while not subscription.dropped:
+                try:
+                    yield subscription.queue.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+    
+    @property
+    def subscriber_count(self) -> int:
+        with self.lock:
+            return len(self.subscribers)
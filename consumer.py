@@ -0,0 +1,209 @@
+"""
+Shared bookkeeping for in-memory services built from saved results.
+
+The rank, statistics and leaderboard services each keep state derived from
+the results table. A result reaches a service in one of two ways: add(),
+called by the request that saved it, or a catch-up query for results saved
+after the last one seen, which is how results from other processes arrive
+(and ones whose add() hasn't run yet, when a checkpoint is written).
+ResultConsumer applies each result exactly once whichever way it comes, and
+never checkpoints a result ID past a result missing from the state.
+
+IDs are allocated on insert but rows only become visible on commit, so a
+lower ID can show up after a higher one. The watermark (last_result_id)
+only moves past results that can no longer be overtaken: catch-up reads
+wait out this process's in-flight saves (GameDatabase.saves_paused()), and
+with settle_seconds set, results younger than that are applied and tracked
+by ID without advancing it, which leaves other processes' saves time to
+commit. Tracked IDs are checkpointed along with the state.
+
+Subclasses provide the state itself through a handful of hooks.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterator, Optional, Set, Tuple
+
+
+def as_datetime(value) -> datetime:
+    """Result timestamps come back as datetime (PostgreSQL) or ISO text (SQLite)."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class ResultConsumer:
+    """Applies each saved result to in-memory state exactly once."""
+    
+    def __init__(self, db, checkpoint_every: Optional[int] = None,
+                 checkpoint_interval: float = 60.0, settle_seconds: float = 0.0):
+        """
+        Args:
+            db: GameDatabase to read results from and checkpoint to
+            checkpoint_every: Checkpoint after this many changes (None to
+                              never checkpoint)...
+            checkpoint_interval: ...or this many seconds, whichever comes first
+            settle_seconds: How long another process may take to commit a
+                            result after timestamping it (0 when this
+                            process is the only writer)
+        """
+        self.db = db
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.settle_seconds = settle_seconds
+        # Every result up to last_result_id is applied; results applied above
+        # it are tracked by ID until the watermark passes them
+        self.last_result_id = 0
+        self.applied: Set[int] = set()
+        # Changes since the last checkpoint; _apply() implementations count them
+        self.pending = 0
+        self.last_checkpoint = time.time()
+        # Reentrant so a caller can hold it across several calls
+        self.lock = threading.RLock()
+        self.warm_lock = threading.Lock()
+        self.warmed = False
+    
+    # Hooks for subclasses
+    
+    def _restore(self) -> bool:
+        """Load the last checkpoint, setting last_result_id and applied.
+        
+        Called with the lock held and saves paused.
+        
+        Returns:
+            Whether a checkpoint was found
+        """
+        return False
+    
+    def _results_after(self, last_id: int) -> Iterator[Tuple[int, Any, tuple]]:
+        """Yield (result_id, timestamp, args for _apply) for results after last_id, in ID order."""
+        raise NotImplementedError
+    
+    def _apply(self, result_id: int, *args, notify: bool = True) -> Any:
+        """Apply one result to the state. Call with the lock held."""
+        raise NotImplementedError
+    
+    def _checkpoint_data(self):
+        """Snapshot the state for _save_checkpoint(). Call with the lock held."""
+        raise NotImplementedError
+    
+    def _save_checkpoint(self, data):
+        """Write a snapshot from _checkpoint_data() to the database."""
+        raise NotImplementedError
+    
+    # Shared machinery
+    
+    def _last_settled_id(self) -> Optional[int]:
+        """ID of the last result too old to be overtaken (None if settle_seconds is 0).
+        
+        Restores that load results without a checkpoint cap last_result_id
+        at this.
+        """
+        if not self.settle_seconds:
+            return None
+        return self.db.get_last_result_id_before(
+            datetime.now() - timedelta(seconds=self.settle_seconds))
+    
+    def warm(self) -> int:
+        """Load the last checkpoint and apply results saved after it.
+        
+        Returns:
+            The number of results applied after the checkpoint
+        """
+        with self.lock, self.db.saves_paused():
+            restored = self._restore()
+            applied = self._catch_up(notify=False)
+            self.warmed = True
+        
+        if self.checkpoint_every is not None and (applied or not restored):
+            self.checkpoint()
+        return applied
+    
+    def ensure_warm(self):
+        """Warm from the database once; concurrent callers wait for it."""
+        if self.warmed:
+            return
+        with self.warm_lock:
+            if not self.warmed:
+                self.warm()
+    
+    def _catch_up(self, notify: bool = True) -> int:
+        """Apply results after last_result_id not already added. Call with the lock held.
+        
+        Returns:
+            The number of results applied
+        """
+        settled_before = datetime.now() - timedelta(seconds=self.settle_seconds)
+        settled = True
+        applied = 0
+        with self.db.saves_paused():
+            for result_id, timestamp, args in self._results_after(self.last_result_id):
+                if result_id not in self.applied:
+                    self._apply(result_id, *args, notify=notify)
+                    self.applied.add(result_id)
+                    applied += 1
+                # The watermark stops at the first result that might still
+                # have a lower ID committing in another process
+                if settled and self.settle_seconds:
+                    settled = as_datetime(timestamp) <= settled_before
+                if settled:
+                    self.last_result_id = result_id
+        self.applied = {result_id for result_id in self.applied
+                        if result_id > self.last_result_id}
+        return applied
+    
+    def refresh(self) -> int:
+        """Apply results saved since the last one seen, by any process.
+        
+        Returns:
+            The number of results applied
+        """
+        self.ensure_warm()
+        with self.lock:
+            applied = self._catch_up()
+            due = self._checkpoint_due()
+        
+        if due:
+            self.checkpoint()
+        return applied
+    
+    def add(self, result_id: int, *args) -> Any:
+        """
+        Apply a result saved by this process, checkpointing when one is due.
+        
+        Results already applied from the database are ignored.
+        
+        Returns:
+            Whatever _apply() returns, or None if the result was ignored
+        """
+        with self.lock:
+            if result_id <= self.last_result_id or result_id in self.applied:
+                return None
+            value = self._apply(result_id, *args)
+            self.applied.add(result_id)
+            due = self._checkpoint_due()
+        
+        if due:
+            self.checkpoint()
+        return value
+    
+    def _checkpoint_due(self) -> bool:
+        return bool(self.checkpoint_every is not None and self.pending and
+                    (self.pending >= self.checkpoint_every or
+                     time.time() - self.last_checkpoint >= self.checkpoint_interval))
+    
+    def checkpoint(self):
+        """Persist the state together with the last result ID it includes.
+        
+        Results saved but not yet added are applied first, so the stored ID
+        never runs ahead of a result missing from the state. The payload
+        must include applied, the IDs above it already in the state.
+        """
+        with self.lock:
+            self._catch_up()
+            data = self._checkpoint_data()
+            self.pending = 0
+            self.last_checkpoint = time.time()
+        
+        self._save_checkpoint(data)
@@ -3,24 +3,160 @@ Database operations for the number sequence speed test game.
 Supports PostgreSQL (production) with SQLite fallback (local development).
 """
 
+import functools
+import importlib.util
+import itertools
 import os
 import sqlite3
-from datetime import datetime
-from typing import List, Tuple, Optional
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Iterator, List, Tuple, Optional
 
-# Try to import psycopg2 for PostgreSQL support
-try:
-    import psycopg2
-    PSYCOPG2_AVAILABLE = True
-except ImportError:
-    PSYCOPG2_AVAILABLE = False
+from queries import execute, execute_many, render_queries
+
+# psycopg2 is only imported when the first PostgreSQL connection is opened,
+# so importing this module stays cheap; here we just check it is installed
+PSYCOPG2_AVAILABLE = importlib.util.find_spec('psycopg2') is not None
+psycopg2 = None
+
+# Bump whenever create_tables() changes, so existing databases get the new DDL
+SCHEMA_VERSION = 4
+
+
+def _load_psycopg2():
+    """Import psycopg2 on first use."""
+    global psycopg2
+    if psycopg2 is None:
+        import psycopg2 as module
+        psycopg2 = module
+    return psycopg2
+
+
+def read_query(method):
+    """Route a read-only GameDatabase method to a read replica.
+    
+    The method runs against a healthy replica when one is configured; if
+    the replica can't be reached it is taken out of rotation and the method
+    is run again on the primary. Other errors, such as bad parameters from
+    the request, say nothing about the replica and are raised as usual.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        replica = self._pick_replica()
+        if replica is not None:
+            self._local.read_target = replica.target
+            try:
+                return method(self, *args, **kwargs)
+            except self._connection_errors() as exc:
+                self._mark_down(replica, exc)
+            finally:
+                self._local.read_target = None
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _Replica:
+    """A read replica and its health state."""
+    
+    def __init__(self, target: str):
+        self.target = target
+        self.healthy = True
+        self.retry_at = 0.0
+
+
+class _SaveGate:
+    """Lets catch-up reads wait out this process's in-flight saves.
+    
+    A result's ID is allocated when it is inserted but only becomes visible
+    at commit, so two saves can commit out of ID order. A reader that
+    closes the gate waits for running saves to commit and holds new ones
+    back until it is done, so nothing it reads can be overtaken by a
+    lower ID from this process.
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.saving = 0
+        self.readers = 0
+    
+    @contextmanager
+    def save(self):
+        with self.condition:
+            while self.readers:
+                self.condition.wait()
+            self.saving += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.saving -= 1
+                self.condition.notify_all()
+    
+    @contextmanager
+    def read(self):
+        with self.condition:
+            self.readers += 1
+            while self.saving:
+                self.condition.wait()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                self.condition.notify_all()
+
+
+class _PooledConnection:
+    """A database connection that goes back to its pool when closed."""
+    
+    def __init__(self, raw, pool: list, pool_size: int):
+        self.raw = raw
+        self.pool = pool
+        self.pool_size = pool_size
+        # Names of the statements prepared on this connection (PostgreSQL)
+        self.prepared = set()
+    
+    def cursor(self, *args, **kwargs):
+        return self.raw.cursor(*args, **kwargs)
+    
+    def commit(self):
+        self.raw.commit()
+    
+    def rollback(self):
+        self.raw.rollback()
+    
+    def close(self):
+        """End any open transaction and return the connection to its pool.
+        
+        Connections that raised mid-query are never closed this way, so
+        they are dropped rather than reused.
+        """
+        try:
+            self.raw.rollback()
+        except Exception:
+            self.raw.close()
+            return
+        # list.append and list.pop are atomic, so the pool needs no lock
+        if len(self.pool) < self.pool_size:
+            self.pool.append(self)
+        else:
+            self.raw.close()
 
 
 class GameDatabase:
     """Handles all database operations for the game."""
     
-    def __init__(self, db_name: str = "game_results.db"):
-        """Initialize database connection and create tables if needed."""
+    def __init__(self, db_name: str = "game_results.db", lazy: bool = False):
+        """
+        Initialize database settings and create tables if needed.
+        
+        Args:
+            db_name: SQLite file used when DATABASE_URL is not set
+            lazy: Defer connecting and the schema check until the first query
+                  (or an explicit ensure_schema() call)
+        """
         # Check for PostgreSQL connection string
         self.database_url = os.environ.get('DATABASE_URL')
         
@@ -45,21 +181,259 @@ class GameDatabase:
             self.db_name = db_name
             print(f"Using SQLite database: {db_name}")
         
-        self.create_tables()
+        # Optional native partitioning of new PostgreSQL results tables.
+        # ensure_schema() replaces this with what the existing table really
+        # is, since tables are never converted.
+        self.partition_requested = (
+            self.use_postgres and
+            os.environ.get('RESULTS_PARTITIONED', 'false').lower() == 'true'
+        )
+        self.partitioned = self.partition_requested
+        
+        self.schema_ready = False
+        self._schema_lock = threading.Lock()
+        self._save_gate = _SaveGate()
+        
+        # Optional read replicas: PostgreSQL URLs, or SQLite files (plain
+        # paths or sqlite:///path) when the primary is SQLite
+        self.replicas = [
+            _Replica(self._normalize_read_url(url.strip()))
+            for url in os.environ.get('DATABASE_READ_URLS', '').split(',')
+            if url.strip()
+        ]
+        self._replica_cycle = itertools.cycle(range(len(self.replicas)))
+        self.replica_retry_seconds = float(os.environ.get('DATABASE_READ_RETRY_SECONDS', 30))
+        self._local = threading.local()
+        if self.replicas:
+            print(f"Using {len(self.replicas)} read replica(s)")
+        
+        # Queries are rendered for this dialect once; connections are kept
+        # open in per-target pools so PostgreSQL prepared statements and
+        # SQLite's statement cache survive between calls
+        self.queries = render_queries(self.use_postgres)
+        self.prepare_statements = (
+            os.environ.get('DATABASE_PREPARED_STATEMENTS', 'true').lower() == 'true'
+        )
+        self.pool_size = int(os.environ.get('DATABASE_POOL_SIZE', 8))
+        self._pools = {}
+        self._pool_pid = os.getpid()
+        
+        if not lazy:
+            self.ensure_schema()
+    
+    def _normalize_read_url(self, url: str) -> str:
+        """Convert a read replica URL to what _connect() expects."""
+        if self.use_postgres:
+            if url.startswith('postgres://'):
+                url = url.replace('postgres://', 'postgresql://', 1)
+            return url
+        if url.startswith('sqlite:///'):
+            url = url[len('sqlite:///'):]
+        return url
     
-    def _get_connection(self):
-        """Get a database connection (PostgreSQL or SQLite)."""
+    def _connect(self, read_target: str = None):
+        """Open a new database connection (PostgreSQL or SQLite).
+        
+        Args:
+            read_target: Read replica to connect to instead of the primary
+        """
         if self.use_postgres:
-            return psycopg2.connect(self.database_url)
+            return _load_psycopg2().connect(read_target or self.database_url)
+        elif read_target:
+            # Replicas are opened read-only and must already exist
+            return sqlite3.connect(f"file:{read_target}?mode=ro", uri=True,
+                                   check_same_thread=False)
         else:
-            return sqlite3.connect(self.db_name)
+            # Pooled connections move between threads, one at a time
+            return sqlite3.connect(self.db_name, check_same_thread=False)
     
-    def create_tables(self):
-        """Create the results table if it doesn't exist."""
-        conn = self._get_connection()
+    def _get_connection(self) -> _PooledConnection:
+        """Get a pooled database connection, making sure the schema exists first.
+        
+        Inside a read_query method this may be a read replica. Calling
+        close() on the connection returns it to the pool.
+        """
+        if not self.schema_ready:
+            self.ensure_schema()
+        
+        if self._pool_pid != os.getpid():
+            # Never share connections with a forked child process
+            self._pools = {}
+            self._pool_pid = os.getpid()
+        
+        target = getattr(self._local, 'read_target', None)
+        pool = self._pools.setdefault(target, [])
+        while True:
+            try:
+                conn = pool.pop()
+            except IndexError:
+                break
+            if not (self.use_postgres and conn.raw.closed):
+                return conn
+        
+        return _PooledConnection(self._connect(target), pool, self.pool_size)
+    
+    def _execute(self, conn: _PooledConnection, cursor, name: str, params=()):
+        """Run a query from queries.py by name."""
+        execute(conn, cursor, self.queries[name], params,
+                prepare=self.prepare_statements)
+    
+    def _db_errors(self) -> tuple:
+        """Exception types raised by the database driver in use."""
+        if self.use_postgres:
+            return (_load_psycopg2().Error,)
+        return (sqlite3.Error,)
+    
+    def _connection_errors(self) -> tuple:
+        """Driver exceptions that mean the database itself failed, not the query."""
+        if self.use_postgres:
+            return (_load_psycopg2().OperationalError, _load_psycopg2().InterfaceError)
+        # sqlite3.InterfaceError is also raised for unbindable parameters
+        return (sqlite3.OperationalError,)
+    
+    def _pick_replica(self) -> Optional[_Replica]:
+        """Pick the next healthy replica round-robin, or None to use the primary."""
+        if not self.replicas or getattr(self._local, 'prefer_primary', False):
+            return None
+        
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._replica_cycle)]
+            if replica.healthy:
+                return replica
+            if now >= replica.retry_at and self._check_replica(replica):
+                return replica
+        return None
+    
+    def _check_replica(self, replica: _Replica) -> bool:
+        """Health-check a replica that was taken out of rotation."""
+        try:
+            conn = self._connect(replica.target)
+            try:
+                conn.cursor().execute("SELECT 1 FROM results LIMIT 1")
+            finally:
+                conn.close()
+        except self._db_errors() as exc:
+            self._mark_down(replica, exc)
+            return False
+        
+        replica.healthy = True
+        print("Read replica back in rotation")
+        return True
+    
+    def _mark_down(self, replica: _Replica, exc: Exception):
+        """Take a failing replica out of rotation until its next health check."""
+        if replica.healthy:
+            print(f"Read replica failed, falling back to primary: {exc}")
+        replica.healthy = False
+        replica.retry_at = time.monotonic() + self.replica_retry_seconds
+        # Its pooled connections may be broken; reconnect after the health check
+        self._pools.pop(replica.target, None)
+    
+    def prefer_primary(self, enabled: bool = True):
+        """Send this thread's reads to the primary (read-your-writes).
+        
+        Applies until called again with enabled=False.
+        """
+        self._local.prefer_primary = enabled
+    
+    def ensure_schema(self):
+        """Create or upgrade the schema unless the stored version is current.
+        
+        Safe to call from several threads; only the first call does any work.
+        """
+        if self.schema_ready:
+            return
+        with self._schema_lock:
+            if self.schema_ready:
+                return
+            if self.use_postgres:
+                self.partitioned = self._detect_partitioning()
+            if self.get_schema_version() != SCHEMA_VERSION:
+                self.create_tables()
+            self.schema_ready = True
+    
+    def _detect_partitioning(self) -> bool:
+        """Whether the results table is partitioned (PostgreSQL only).
+        
+        A missing table will be created partitioned if RESULTS_PARTITIONED
+        is set; an existing one is used as it is.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT to_regclass('results') IS NOT NULL,
+                   EXISTS (SELECT 1 FROM pg_partitioned_table
+                           WHERE partrelid = to_regclass('results'))
+        """)
+        exists, partitioned = cursor.fetchone()
+        conn.close()
+        
+        if not exists:
+            return self.partition_requested
+        if self.partition_requested and not partitioned:
+            print("RESULTS_PARTITIONED is set but the existing results table "
+                  "is not partitioned; using it unpartitioned")
+        return partitioned
+    
+    def get_schema_version(self) -> Optional[int]:
+        """Get the schema version recorded by create_tables(), if any."""
+        conn = self._connect()
         cursor = conn.cursor()
         
         if self.use_postgres:
+            cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        else:
+            cursor.execute("""
+                SELECT COUNT(*) FROM sqlite_master
+                WHERE type = 'table' AND name = 'schema_version'
+            """)
+        
+        version = None
+        if cursor.fetchone()[0]:
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+            version = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return version
+    
+    def create_tables(self):
+        """Create the results table and its indexes if they don't exist."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        if self.partitioned:
+            # PostgreSQL, partitioned: completed games live in their own small
+            # partition, failed games are split further into monthly ranges
+            # that retention can roll up and drop whole
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id SERIAL,
+                    player_name TEXT NOT NULL,
+                    time_seconds REAL NOT NULL,
+                    numbers_count INTEGER NOT NULL,
+                    completed BOOLEAN NOT NULL,
+                    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    replay BYTEA,
+                    PRIMARY KEY (id, completed, timestamp)
+                ) PARTITION BY LIST (completed)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS results_completed
+                PARTITION OF results FOR VALUES IN (TRUE)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS results_failed
+                PARTITION OF results FOR VALUES IN (FALSE)
+                PARTITION BY RANGE (timestamp)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS results_failed_default
+                PARTITION OF results_failed DEFAULT
+            """)
+            self._create_failed_partitions(cursor, date.today(), months=2)
+        elif self.use_postgres:
             # PostgreSQL syntax
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS results (
@@ -68,7 +442,8 @@ class GameDatabase:
                     time_seconds REAL NOT NULL,
                     numbers_count INTEGER NOT NULL,
                     completed BOOLEAN NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    replay BYTEA
                 )
             """)
         else:
@@ -80,59 +455,184 @@ class GameDatabase:
                     time_seconds REAL NOT NULL,
                     numbers_count INTEGER NOT NULL,
                     completed BOOLEAN NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    replay BLOB
                 )
             """)
         
+        # Add the replay column to tables created before it existed
+        if self.use_postgres:
+            cursor.execute("ALTER TABLE results ADD COLUMN IF NOT EXISTS replay BYTEA")
+        else:
+            cursor.execute("PRAGMA table_info(results)")
+            if "replay" not in [row[1] for row in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE results ADD COLUMN replay BLOB")
+        
+        # Indexes backing keyset pagination. Leaderboards page on
+        # (time_seconds, id) among completed games and recent results page on
+        # (timestamp, id), so each page is a single index range scan.
+        cursor.execute(self.queries["create_index_leaderboard"].sql)
+        cursor.execute(self.queries["create_index_leaderboard_all"].sql)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_results_recent
+            ON results (timestamp, id)
+        """)
+        # Retention walks expired failed games oldest first; completed games
+        # are kept forever, so they are left out of the index it scans
+        cursor.execute(self.queries["create_index_failed"].sql)
+        
+        # Each player's fastest completion per circle count, kept up to date
+        # by save_result(). The index covers the best-per-player leaderboard
+        # queries, so they read only the index instead of grouping results.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_bests (
+                numbers_count INTEGER NOT NULL,
+                player_name TEXT NOT NULL,
+                best_time REAL NOT NULL,
+                result_id INTEGER NOT NULL,
+                timestamp TIMESTAMP,
+                PRIMARY KEY (numbers_count, player_name)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_player_bests_leaderboard
+            ON player_bests (numbers_count, best_time, player_name, timestamp)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_player_bests_leaderboard_all
+            ON player_bests (best_time, player_name, numbers_count, timestamp)
+        """)
+        # Fill it from games saved before the table existed; a no-op afterwards
+        cursor.execute(self.queries["backfill_player_bests"].sql)
+        
+        # Checkpointed statistics sketches, one row per circle count
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_sketches (
+                numbers_count INTEGER PRIMARY KEY,
+                sketch TEXT NOT NULL,
+                last_result_id INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Checkpointed day/week/all-time leaderboards, one row per circle count
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS leaderboard_summaries (
+                numbers_count INTEGER PRIMARY KEY,
+                summary TEXT NOT NULL,
+                last_result_id INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Per-day roll-up of failed games removed by retention
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_failures (
+                day DATE NOT NULL,
+                numbers_count INTEGER NOT NULL,
+                games INTEGER NOT NULL,
+                total_time_seconds REAL NOT NULL,
+                PRIMARY KEY (day, numbers_count)
+            )
+        """)
+        
+        # Record the schema version so later startups can skip this DDL
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("DELETE FROM schema_version")
+        cursor.execute(f"INSERT INTO schema_version (version) VALUES ({SCHEMA_VERSION})")
+        
         conn.commit()
         conn.close()
     
     def save_result(self, player_name: str, time_seconds: float, 
-                   numbers_count: int, completed: bool) -> int:
+                   numbers_count: int, completed: bool,
+                   replay: Optional[bytes] = None) -> int:
         """
         Save a game result to the database.
         
+        A completed game also replaces the player's personal best for its
+        circle count if it is faster.
+        
         Args:
             player_name: Name of the player
             time_seconds: Time taken to complete/fail the game
             numbers_count: Number of circles in the game
             completed: Whether the game was completed successfully
+            replay: Optional binary click log (see replay.py)
             
         Returns:
             The ID of the inserted record
         """
+        with self._save_gate.save():
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            params = (player_name, time_seconds, numbers_count, completed, datetime.now(), replay)
+            if self.use_postgres:
+                self._execute(conn, cursor, "insert_result_returning", params)
+                result_id = cursor.fetchone()[0]
+            else:
+                self._execute(conn, cursor, "insert_result", params)
+                result_id = cursor.lastrowid
+            
+            if completed:
+                self._execute(conn, cursor, "upsert_player_best",
+                              (numbers_count, player_name, time_seconds, result_id, params[4]))
+            
+            conn.commit()
+            conn.close()
+        
+        return result_id
+    
+    @contextmanager
+    def saves_paused(self):
+        """
+        Wait for this process's in-flight saves to commit and hold new ones
+        back until the block exits.
+        
+        Readers that track the highest result ID they have seen read inside
+        this block, so no lower ID from this process can commit after it.
+        Saves from other processes are not covered.
+        """
+        with self._save_gate.read():
+            yield
+    
+    @read_query
+    def get_replay(self, result_id: int) -> Optional[Tuple]:
+        """
+        Get a game result together with its click log.
+        
+        Args:
+            result_id: ID of the result
+            
+        Returns:
+            Tuple (player_name, time_seconds, numbers_count, completed, replay),
+            or None if there is no such result
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if self.use_postgres:
-            # PostgreSQL uses %s for parameters
-            cursor.execute("""
-                INSERT INTO results (player_name, time_seconds, numbers_count, completed, timestamp)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (player_name, time_seconds, numbers_count, completed, datetime.now()))
-            result_id = cursor.fetchone()[0]
-        else:
-            # SQLite uses ? for parameters
-            cursor.execute("""
-                INSERT INTO results (player_name, time_seconds, numbers_count, completed, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (player_name, time_seconds, numbers_count, completed, datetime.now()))
-            result_id = cursor.lastrowid
+        self._execute(conn, cursor, "get_replay", (result_id,))
         
-        conn.commit()
+        result = cursor.fetchone()
         conn.close()
         
-        return result_id
+        return result
     
+    @read_query
     def get_leaderboard(self, numbers_count: Optional[int] = None, 
-                       limit: int = 10) -> List[Tuple]:
+                       limit: int = 10, best_per_player: bool = False) -> List[Tuple]:
         """
         Get the top completed games (fastest times).
         
         Args:
             numbers_count: Filter by specific number of circles (None for all)
             limit: Maximum number of results to return
+            best_per_player: Only each player's personal best, from player_bests
             
         Returns:
             List of tuples (player_name, time_seconds, numbers_count, timestamp)
@@ -140,54 +640,26 @@ class GameDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if self.use_postgres:
-            # PostgreSQL uses %s for parameters
-            if numbers_count is not None:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = TRUE AND numbers_count = %s
-                    ORDER BY time_seconds ASC
-                    LIMIT %s
-                """, (numbers_count, limit))
-            else:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = TRUE
-                    ORDER BY time_seconds ASC
-                    LIMIT %s
-                """, (limit,))
+        name = "player_bests" if best_per_player else "leaderboard"
+        if numbers_count is not None:
+            self._execute(conn, cursor, name + "_by_count", (numbers_count, limit))
         else:
-            # SQLite uses ? for parameters
-            if numbers_count is not None:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = 1 AND numbers_count = ?
-                    ORDER BY time_seconds ASC
-                    LIMIT ?
-                """, (numbers_count, limit))
-            else:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = 1
-                    ORDER BY time_seconds ASC
-                    LIMIT ?
-                """, (limit,))
+            self._execute(conn, cursor, name, (limit,))
         
         results = cursor.fetchall()
         conn.close()
         
         return results
     
-    def get_leaderboard_grouped_by_circles(self, limit_per_group: int = 10) -> dict:
+    @read_query
+    def get_leaderboard_grouped_by_circles(self, limit_per_group: int = 10,
+                                           best_per_player: bool = False) -> dict:
         """
         Get leaderboards grouped by number of circles.
         
         Args:
             limit_per_group: Maximum number of results per circle count
+            best_per_player: Only each player's personal best, from player_bests
             
         Returns:
             Dictionary mapping circle counts to leaderboard entries
@@ -197,49 +669,25 @@ class GameDatabase:
         cursor = conn.cursor()
         
         # Get all unique circle counts that have completed games
-        if self.use_postgres:
-            cursor.execute("""
-                SELECT DISTINCT numbers_count
-                FROM results
-                WHERE completed = TRUE
-                ORDER BY numbers_count ASC
-            """)
+        if best_per_player:
+            self._execute(conn, cursor, "player_best_counts")
         else:
-            cursor.execute("""
-                SELECT DISTINCT numbers_count
-                FROM results
-                WHERE completed = 1
-                ORDER BY numbers_count ASC
-            """)
+            self._execute(conn, cursor, "completed_counts")
         
         circle_counts = [row[0] for row in cursor.fetchall()]
         
         # Get leaderboard for each circle count
+        name = "player_bests_by_count" if best_per_player else "leaderboard_by_count"
         grouped_leaderboard = {}
         for count in circle_counts:
-            if self.use_postgres:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = TRUE AND numbers_count = %s
-                    ORDER BY time_seconds ASC
-                    LIMIT %s
-                """, (count, limit_per_group))
-            else:
-                cursor.execute("""
-                    SELECT player_name, time_seconds, numbers_count, timestamp
-                    FROM results
-                    WHERE completed = 1 AND numbers_count = ?
-                    ORDER BY time_seconds ASC
-                    LIMIT ?
-                """, (count, limit_per_group))
-            
+            self._execute(conn, cursor, name, (count, limit_per_group))
             grouped_leaderboard[count] = cursor.fetchall()
         
         conn.close()
         
         return grouped_leaderboard
     
+    @read_query
     def get_all_results(self, limit: int = 20) -> List[Tuple]:
         """
         Get recent game results (completed and failed).
@@ -253,22 +701,471 @@ class GameDatabase:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        if self.use_postgres:
-            cursor.execute("""
-                SELECT player_name, time_seconds, numbers_count, completed, timestamp
-                FROM results
-                ORDER BY timestamp DESC
-                LIMIT %s
-            """, (limit,))
-        else:
-            cursor.execute("""
-                SELECT player_name, time_seconds, numbers_count, completed, timestamp
-                FROM results
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (limit,))
+        self._execute(conn, cursor, "recent_results", (limit,))
         
         results = cursor.fetchall()
         conn.close()
         
         return results
+    
+    @read_query
+    def get_leaderboard_page(self, numbers_count: Optional[int] = None,
+                             limit: int = 10,
+                             after: Optional[Tuple[float, int]] = None) -> List[Tuple]:
+        """
+        Get one page of the leaderboard using keyset pagination.
+        
+        Rows are ordered by (time_seconds, id), so the cost of a page does
+        not depend on how deep into the leaderboard it is.
+        
+        Args:
+            numbers_count: Filter by specific number of circles (None for all)
+            limit: Maximum number of results to return
+            after: (time_seconds, id) of the last row of the previous page,
+                   or None for the first page
+            
+        Returns:
+            List of tuples (id, player_name, time_seconds, numbers_count, timestamp)
+        """
+        name = "leaderboard_page"
+        params = []
+        if numbers_count is not None:
+            name += "_by_count"
+            params.append(numbers_count)
+        if after is not None:
+            name += "_after"
+            params.extend(after)
+        params.append(limit)
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, name, params)
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    @read_query
+    def get_results_page(self, limit: int = 20,
+                         before: Optional[Tuple[str, int]] = None) -> List[Tuple]:
+        """
+        Get one page of recent game results using keyset pagination.
+        
+        Rows are ordered newest first by (timestamp, id).
+        
+        Args:
+            limit: Maximum number of results to return
+            before: (timestamp, id) of the last row of the previous page,
+                    or None for the first page
+            
+        Returns:
+            List of tuples (id, player_name, time_seconds, numbers_count, completed, timestamp)
+        """
+        name = "results_page"
+        params = []
+        if before is not None:
+            name += "_before"
+            params.extend(before)
+        params.append(limit)
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, name, params)
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def iter_completed_times(self, batch_size: int = 10000) -> Iterator[Tuple]:
+        """
+        Stream (id, numbers_count, time_seconds, timestamp) for every completed game.
+        
+        Used to warm in-memory structures at startup without loading the
+        whole table at once.
+        
+        Args:
+            batch_size: Number of rows fetched per round trip
+            
+        Yields:
+            Tuples (id, numbers_count, time_seconds, timestamp)
+        """
+        conn = self._get_connection()
+        try:
+            if self.use_postgres:
+                # Named cursor streams rows from the server in batches; it
+                # can't run a prepared statement, so send the plain text
+                cursor = conn.cursor(name="completed_times")
+                cursor.itersize = batch_size
+            else:
+                cursor = conn.cursor()
+            cursor.execute(self.queries["completed_times"].sql)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
+    def iter_results_after(self, last_id: int,
+                           batch_size: int = 10000) -> Iterator[Tuple]:
+        """
+        Stream every result with an ID greater than last_id, in ID order.
+        
+        Args:
+            last_id: Only return results saved after this ID
+            batch_size: Number of rows fetched per round trip
+            
+        Yields:
+            Tuples (id, numbers_count, time_seconds, completed, timestamp)
+        """
+        conn = self._get_connection()
+        try:
+            if self.use_postgres:
+                cursor = conn.cursor(name="results_after")
+                cursor.itersize = batch_size
+            else:
+                cursor = conn.cursor()
+            cursor.execute(self.queries["results_after"].sql, (last_id,))
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row_id, numbers_count, time_seconds, completed, timestamp in rows:
+                    yield row_id, numbers_count, time_seconds, bool(completed), timestamp
+        finally:
+            conn.close()
+    
+    def get_top_results_snapshot(self, limit_per_group: int = 10) -> Tuple[int, dict]:
+        """
+        Get the leaderboard for every circle count, with result IDs.
+        
+        Always reads the primary, so get_completed_after() can continue from
+        the returned ID. Run it inside saves_paused(): a save still in
+        flight could otherwise commit an ID below it afterwards. Other
+        processes' saves can still do that; callers cap the ID with
+        get_last_result_id_before() when there are other writers.
+        
+        Args:
+            limit_per_group: Maximum number of results per circle count
+            
+        Returns:
+            Tuple (last_result_id, {numbers_count: [(id, player_name, time_seconds, timestamp), ...]})
+            where last_result_id was the highest result ID before the read
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        self._execute(conn, cursor, "max_result_id")
+        last_id = cursor.fetchone()[0]
+        
+        self._execute(conn, cursor, "completed_counts")
+        circle_counts = [row[0] for row in cursor.fetchall()]
+        
+        grouped = {}
+        for count in circle_counts:
+            self._execute(conn, cursor, "leaderboard_page_by_count", (count, limit_per_group))
+            grouped[count] = [(row_id, name, time_seconds, timestamp)
+                              for row_id, name, time_seconds, _, timestamp in cursor.fetchall()]
+        
+        conn.close()
+        
+        return last_id, grouped
+    
+    def get_last_result_id_before(self, moment: datetime) -> int:
+        """
+        Get the ID of the last result saved at or before a time (primary only).
+        
+        Args:
+            moment: Latest timestamp to consider
+            
+        Returns:
+            The result ID, or 0 if there is none
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, "last_result_before", (moment,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else 0
+    
+    def get_completed_after(self, last_id: int, limit: int = 1000) -> List[Tuple]:
+        """
+        Get completed results saved after last_id, in ID order (primary only).
+        
+        Args:
+            last_id: Only return results with a greater ID
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of tuples (id, player_name, time_seconds, numbers_count, timestamp)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, "completed_after", (last_id, limit))
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def iter_completed_since(self, since: datetime,
+                             batch_size: int = 10000) -> Iterator[Tuple]:
+        """
+        Stream completed results saved at or after a time (primary only).
+        
+        Args:
+            since: Earliest timestamp to include
+            batch_size: Number of rows fetched per round trip
+            
+        Yields:
+            Tuples (id, player_name, time_seconds, numbers_count, timestamp)
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            self._execute(conn, cursor, "completed_since", (since,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
+    def load_leaderboard_summaries(self) -> List[Tuple[int, str, int]]:
+        """
+        Get all checkpointed windowed leaderboards.
+        
+        Returns:
+            List of tuples (numbers_count, summary_json, last_result_id)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, "load_leaderboard_summaries")
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def save_leaderboard_summaries(self, summaries: List[Tuple[int, str, int]]):
+        """
+        Upsert windowed leaderboards.
+        
+        Args:
+            summaries: List of tuples (numbers_count, summary_json, last_result_id)
+        """
+        if not summaries:
+            return
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        execute_many(conn, cursor, self.queries["save_leaderboard_summary"], summaries,
+                     prepare=self.prepare_statements)
+        conn.commit()
+        conn.close()
+    
+    def load_stats_checkpoints(self) -> List[Tuple[int, str, int]]:
+        """
+        Get all checkpointed statistics sketches.
+        
+        Returns:
+            List of tuples (numbers_count, sketch_json, last_result_id)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        self._execute(conn, cursor, "load_stats_checkpoints")
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def save_stats_checkpoints(self, checkpoints: List[Tuple[int, str, int]]):
+        """
+        Upsert statistics sketches.
+        
+        Args:
+            checkpoints: List of tuples (numbers_count, sketch_json, last_result_id)
+        """
+        if not checkpoints:
+            return
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        execute_many(conn, cursor, self.queries["save_stats_checkpoint"], checkpoints,
+                     prepare=self.prepare_statements)
+        
+        conn.commit()
+        conn.close()
+    
+    def _add_daily_failures(self, conn, cursor, rollup: List[Tuple[str, int, int, float]]):
+        """Add (day, numbers_count, games, total_time_seconds) rows to daily_failures."""
+        execute_many(conn, cursor, self.queries["add_daily_failures"], rollup,
+                     prepare=self.prepare_statements)
+    
+    def roll_up_failed_batch(self, cutoff: datetime, batch_size: int = 500) -> int:
+        """
+        Roll up and delete one batch of failed games older than cutoff.
+        
+        The selected rows are added to daily_failures and deleted in the same
+        transaction, so each call does a bounded amount of work.
+        
+        Args:
+            cutoff: Failed games saved before this time are rolled up
+            batch_size: Maximum number of rows to remove
+            
+        Returns:
+            The number of rows removed (0 when nothing is left to roll up)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        # Oldest first, as a range scan on idx_results_failed
+        self._execute(conn, cursor, "expired_failures", (cutoff, batch_size))
+        rows = cursor.fetchall()
+        
+        if not rows:
+            conn.close()
+            return 0
+        
+        totals = {}
+        for row_id, timestamp, numbers_count, time_seconds in rows:
+            # datetime from PostgreSQL, ISO text from SQLite
+            day = str(timestamp)[:10]
+            games, total_time = totals.get((day, numbers_count), (0, 0.0))
+            totals[(day, numbers_count)] = (games + 1, total_time + time_seconds)
+        rollup = [
+            (day, numbers_count, games, total_time)
+            for (day, numbers_count), (games, total_time) in totals.items()
+        ]
+        self._add_daily_failures(conn, cursor, rollup)
+        
+        # Exactly the selected rows: the expired failures up to the last one
+        # in (timestamp, id) order
+        last_id, last_timestamp = rows[-1][0], rows[-1][1]
+        self._execute(conn, cursor, "delete_expired_failures",
+                      (cutoff, last_timestamp, last_id))
+        
+        conn.commit()
+        conn.close()
+        
+        return len(rows)
+    
+    @staticmethod
+    def _failed_partition_name(month: date) -> str:
+        return f"results_failed_{month.year:04d}_{month.month:02d}"
+    
+    def ensure_failed_partitions(self, first_month: date, months: int = 3) -> List[str]:
+        """
+        Create monthly failed-game partitions (partitioned PostgreSQL only).
+        
+        Args:
+            first_month: Any date in the first month to create
+            months: Number of consecutive months to create
+            
+        Returns:
+            Names of the partitions that exist for those months
+        """
+        self.ensure_schema()
+        if not self.partitioned:
+            return []
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        names = self._create_failed_partitions(cursor, first_month, months)
+        conn.commit()
+        conn.close()
+        
+        return names
+    
+    def _create_failed_partitions(self, cursor, first_month: date, months: int) -> List[str]:
+        """Create missing monthly failed-game partitions on an open cursor.
+        
+        Failed games already in the default partition for a new month are
+        moved into it, since PostgreSQL won't add a partition whose range
+        overlaps rows in the default one.
+        """
+        names = []
+        start = first_month.replace(day=1)
+        for _ in range(months):
+            end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+            name = self._failed_partition_name(start)
+            names.append(name)
+            
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (name,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"""
+                    CREATE TABLE {name}
+                    (LIKE results_failed INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                """)
+                cursor.execute(f"""
+                    WITH moved AS (
+                        DELETE FROM results_failed_default
+                        WHERE timestamp >= %s AND timestamp < %s
+                        RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                """, (start, end))
+                cursor.execute(f"""
+                    ALTER TABLE results_failed ATTACH PARTITION {name}
+                    FOR VALUES FROM (%s) TO (%s)
+                """, (start, end))
+            start = end
+        
+        return names
+    
+    def drop_failed_partitions_before(self, cutoff: datetime) -> List[str]:
+        """
+        Roll up and drop monthly failed-game partitions that end before cutoff.
+        
+        Dropping a whole partition is constant-time regardless of how many
+        rows it holds (partitioned PostgreSQL only).
+        
+        Returns:
+            Names of the partitions that were dropped
+        """
+        self.ensure_schema()
+        if not self.partitioned:
+            return []
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'results_failed'
+            ORDER BY c.relname
+        """)
+        partitions = [row[0] for row in cursor.fetchall()]
+        
+        dropped = []
+        for name in partitions:
+            try:
+                year, month = int(name[-7:-3]), int(name[-2:])
+            except ValueError:
+                # Not a monthly partition (e.g. results_failed_default)
+                continue
+            end = date(year + month // 12, month % 12 + 1, 1)
+            if datetime.combine(end, datetime.min.time()) > cutoff:
+                continue
+            
+            cursor.execute(f"""
+                SELECT CAST(timestamp AS DATE), numbers_count, COUNT(*), SUM(time_seconds)
+                FROM {name}
+                GROUP BY 1, 2
+            """)
+            self._add_daily_failures(conn, cursor, cursor.fetchall())
+            cursor.execute(f"DROP TABLE {name}")
+            conn.commit()
+            dropped.append(name)
+        
+        conn.close()
+        
+        return dropped
@@ -0,0 +1,177 @@
+"""
+Headless game engine for the number sequence speed test.
+
+Board generation and click resolution shared by the Tkinter client
+(game.py), the web server (main.py) and the bot simulator (simulate.py).
+Nothing in this module depends on a UI or web framework.
+"""
+
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Click results
+EMPTY = 'empty'
+CORRECT = 'correct'
+COMPLETE = 'complete'
+WRONG = 'wrong'
+
+
+class Circle:
+    """Represents a numbered circle in the game."""
+    
+    def __init__(self, x: float, y: float, number: int, radius: int = 30):
+        self.x = x
+        self.y = y
+        self.number = number
+        self.radius = radius
+        self.clicked = False
+    
+    def contains_point(self, px: float, py: float) -> bool:
+        """Check if a point is inside this circle."""
+        return (px - self.x) ** 2 + (py - self.y) ** 2 <= self.radius ** 2
+    
+    def overlaps_with(self, other: 'Circle') -> bool:
+        """Check if this circle overlaps with another circle."""
+        min_distance = self.radius + other.radius + 10  # 10px padding
+        return (self.x - other.x) ** 2 + (self.y - other.y) ** 2 < min_distance ** 2
+    
+    def to_dict(self):
+        """Convert circle to dictionary for JSON serialization."""
+        return {
+            'x': self.x,
+            'y': self.y,
+            'number': self.number,
+            'radius': self.radius,
+            'clicked': self.clicked
+        }
+
+
+def generate_circles(count: int, width: int, height: int, radius: int = 30,
+                     safe_area: dict = None, rng: random.Random = None) -> List[Circle]:
+    """Generate non-overlapping circles at random positions within safe area."""
+    rng = rng or random
+    circles = []
+    
+    # Use safe area if provided, otherwise add basic padding
+    if safe_area:
+        min_x = safe_area.get('minX', radius + 20)
+        max_x = safe_area.get('maxX', width - radius - 20)
+        min_y = safe_area.get('minY', radius + 20)
+        max_y = safe_area.get('maxY', height - radius - 20)
+    else:
+        min_x = radius + 20
+        max_x = width - radius - 20
+        min_y = radius + 20
+        max_y = height - radius - 20
+    
+    # Ensure we have valid boundaries
+    if max_x <= min_x or max_y <= min_y:
+        # Invalid safe area boundaries - log warning and use conservative defaults
+        print(f"Warning: Invalid safe_area boundaries received. Using defaults. "
+              f"min_x={min_x}, max_x={max_x}, min_y={min_y}, max_y={max_y}")
+        # Use conservative boundaries to ensure circles stay in safe area
+        min_x = max(radius + 40, min_x) if min_x > 0 else radius + 40
+        max_x = min(width - radius - 40, max_x) if max_x > 0 else width - radius - 40
+        min_y = max(radius + 100, min_y) if min_y > 0 else radius + 100  # Extra space for header
+        max_y = min(height - radius - 120, max_y) if max_y > 0 else height - radius - 120  # Extra space for footer
+    
+    for i in range(1, count + 1):
+        max_attempts = 100
+        for attempt in range(max_attempts):
+            # Generate position within safe boundaries
+            x = rng.uniform(min_x, max_x)
+            y = rng.uniform(min_y, max_y)
+            
+            circle = Circle(x, y, i, radius)
+            
+            # Check for overlaps
+            overlap = False
+            for existing in circles:
+                if circle.overlaps_with(existing):
+                    overlap = True
+                    break
+            
+            if not overlap:
+                circles.append(circle)
+                break
+        else:
+            # Force placement if no position found
+            circles.append(circle)
+    
+    return circles
+
+
+class GameSession:
+    """State and rules of a single game, independent of any frontend."""
+    
+    def __init__(self, circles: List[Circle], player_name: str = "Player",
+                 start_time: float = None, clock: Callable[[], float] = time.time):
+        self.circles = circles
+        self.player_name = player_name
+        self.numbers_count = len(circles)
+        self.current_number = 1
+        self.clock = clock
+        self.start_time = clock() if start_time is None else start_time
+        self.end_time: Optional[float] = None
+        self.completed = False  # True once the game has ended (won or lost)
+        self.won = False
+        self.replay = None  # Optional click log maintained by the frontend
+    
+    def elapsed(self, now: float = None) -> float:
+        """Seconds since the game started (frozen once it has ended)."""
+        if self.end_time is not None:
+            return self.end_time - self.start_time
+        return (self.clock() if now is None else now) - self.start_time
+    
+    def find_circle(self, x: float, y: float) -> Optional[Circle]:
+        """Find the unclicked circle at a point, if any."""
+        for circle in self.circles:
+            if not circle.clicked and circle.contains_point(x, y):
+                return circle
+        return None
+    
+    def click(self, x: float, y: float, now: float = None) -> Tuple[str, Optional[Circle]]:
+        """
+        Resolve a click at a point.
+        
+        Args:
+            x, y: Click position
+            now: Time of the click (defaults to the session clock)
+            
+        Returns:
+            Tuple (result, circle) where result is EMPTY, CORRECT, COMPLETE
+            or WRONG and circle is the circle that was hit (None for EMPTY)
+        """
+        if self.completed:
+            raise ValueError("Game already completed")
+        
+        circle = self.find_circle(x, y)
+        
+        # Empty space click - do nothing
+        if circle is None:
+            return EMPTY, None
+        
+        if circle.number == self.current_number:
+            # Correct click
+            circle.clicked = True
+            self.current_number += 1
+            
+            if self.current_number > self.numbers_count:
+                self._finish(won=True, now=now)
+                return COMPLETE, circle
+            return CORRECT, circle
+        
+        # Wrong click - game over
+        self._finish(won=False, now=now)
+        return WRONG, circle
+    
+    def abandon(self, now: float = None):
+        """End the game without completing it (e.g. player quit)."""
+        if not self.completed:
+            self._finish(won=False, now=now)
+    
+    def _finish(self, won: bool, now: float = None):
+        self.end_time = self.clock() if now is None else now
+        self.completed = True
+        self.won = won
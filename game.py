@@ -4,34 +4,119 @@ Main game logic and UI for the number sequence speed test.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
+import queue
+import threading
 import time
-import math
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 from database import GameDatabase
+from engine import COMPLETE, CORRECT, EMPTY, Circle, GameSession, generate_circles
 
 
-class Circle:
-    """Represents a numbered circle in the game."""
+class DatabaseWorker:
+    """Runs database calls on a background thread, off the Tk main loop.
     
-    def __init__(self, x: int, y: int, number: int, radius: int = 30):
-        self.x = x
-        self.y = y
-        self.number = number
-        self.radius = radius
-        self.clicked = False
-        self.canvas_id = None
-        self.text_id = None
+    Calls are executed one at a time in submission order, so a leaderboard
+    read queued after a save always sees that save. Results are handed back
+    to the Tk thread by polling with root.after, since Tk widgets must only
+    be touched from the main thread.
+    """
     
-    def contains_point(self, px: int, py: int) -> bool:
-        """Check if a point is inside this circle."""
-        distance = math.sqrt((px - self.x) ** 2 + (py - self.y) ** 2)
-        return distance <= self.radius
+    def __init__(self, root: tk.Tk, db_factory: Callable[[], GameDatabase] = GameDatabase,
+                 poll_ms: int = 30):
+        self.root = root
+        self.db_factory = db_factory
+        self.poll_ms = poll_ms
+        self.tasks: "queue.Queue" = queue.Queue()
+        self.results: "queue.Queue" = queue.Queue()
+        self.closed = False
+        # Saves submitted but not yet written successfully
+        self.unsaved = 0
+        self.unsaved_lock = threading.Lock()
+        
+        self.thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self.thread.start()
+        self.root.after(self.poll_ms, self._poll)
+    
+    def submit(self, method: str, *args, callback: Callable = None,
+               on_error: Callable[[Exception], None] = None, **kwargs):
+        """Queue a GameDatabase method call.
+        
+        Args:
+            method: Name of the GameDatabase method to call
+            callback: Called on the Tk thread with the return value
+            on_error: Called on the Tk thread with the exception if the call fails
+        """
+        if self.closed:
+            raise RuntimeError("Database worker is shut down")
+        if method == "save_result":
+            with self.unsaved_lock:
+                self.unsaved += 1
+        self.tasks.put((method, args, kwargs, callback, on_error))
+    
+    def _run(self):
+        """Worker thread: connect lazily, then execute tasks in order."""
+        db = None
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            method, args, kwargs, callback, on_error = task
+            try:
+                if db is None:
+                    db = self.db_factory()
+                result = getattr(db, method)(*args, **kwargs)
+                if method == "save_result":
+                    with self.unsaved_lock:
+                        self.unsaved -= 1
+                if callback:
+                    self.results.put((callback, result))
+            except Exception as exc:
+                if on_error:
+                    self.results.put((on_error, exc))
+                else:
+                    print(f"Database error in {method}: {exc}")
     
-    def overlaps_with(self, other: 'Circle') -> bool:
-        """Check if this circle overlaps with another circle."""
-        distance = math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
-        return distance < (self.radius + other.radius + 10)  # 10px padding
+    def _poll(self):
+        """Tk thread: deliver finished results to their callbacks."""
+        try:
+            while True:
+                try:
+                    callback, value = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    callback(value)
+                except Exception as exc:
+                    # e.g. a TclError from a widget that has been replaced
+                    print(f"Database callback failed: {exc}")
+        finally:
+            if not self.closed:
+                self.root.after(self.poll_ms, self._poll)
+    
+    def shutdown(self, on_done: Callable[[int], None], timeout: float = 10.0):
+        """Stop accepting work and let queued calls (e.g. saves) finish.
+        
+        Waits by polling with root.after rather than joining the thread, so
+        the window keeps repainting while a slow database catches up.
+        
+        Args:
+            on_done: Called on the Tk thread with the number of saves that
+                     failed or hadn't finished when the wait ended
+            timeout: Seconds to wait for queued calls before giving up
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.tasks.put(None)
+        deadline = time.monotonic() + timeout
+        
+        def wait():
+            if self.thread.is_alive() and time.monotonic() < deadline:
+                self.root.after(self.poll_ms, wait)
+            else:
+                on_done(self.unsaved)
+        
+        wait()
 
 
 class NumberSequenceGame:
@@ -43,12 +128,12 @@ class NumberSequenceGame:
         self.root.geometry("800x700")
         self.root.resizable(False, False)
         
-        self.db = GameDatabase()
+        # All database access happens on a background worker thread
+        self.db = DatabaseWorker(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Game state
-        self.circles: List[Circle] = []
-        self.current_number = 1
-        self.start_time = None
+        self.session: Optional[GameSession] = None
         self.game_active = False
         self.player_name = ""
         self.numbers_count = 10
@@ -63,24 +148,33 @@ class NumberSequenceGame:
         self.clicked_color = "#2ecc71"
         self.text_color = "white"
         
-        # UI elements
-        self.main_frame = None
-        self.canvas = None
-        self.timer_label = None
-        self.hint_label = None
+        # UI elements (each screen is built once and shown/hidden)
+        self.current_screen = None
+        self.timer_job = None
+        self.circle_items: List[Tuple[int, int]] = []  # reusable (oval, text) canvas items
+        
+        self.start_frame = self.build_start_screen()
+        self.game_frame = self.build_game_screen()
+        self.result_frame = self.build_result_screen()
         
         self.show_start_screen()
     
-    def show_start_screen(self):
-        """Display the start screen with options and leaderboard."""
-        self.clear_screen()
-        
-        self.main_frame = tk.Frame(self.root, bg="#ecf0f1")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
+    def switch_screen(self, frame: tk.Frame):
+        """Hide the current screen and show another one."""
+        if self.current_screen is frame:
+            return
+        if self.current_screen is not None:
+            self.current_screen.pack_forget()
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current_screen = frame
+    
+    def build_start_screen(self) -> tk.Frame:
+        """Build the start screen with options and leaderboard."""
+        frame = tk.Frame(self.root, bg="#ecf0f1")
         
         # Title
         title_label = tk.Label(
-            self.main_frame,
+            frame,
             text="Number Sequence Speed Test",
             font=("Arial", 24, "bold"),
             bg="#ecf0f1",
@@ -90,7 +184,7 @@ class NumberSequenceGame:
         
         # Instructions
         instructions = tk.Label(
-            self.main_frame,
+            frame,
             text="Click the circles in numerical order as fast as you can!",
             font=("Arial", 12),
             bg="#ecf0f1",
@@ -99,7 +193,7 @@ class NumberSequenceGame:
         instructions.pack(pady=10)
         
         # Input frame
-        input_frame = tk.Frame(self.main_frame, bg="#ecf0f1")
+        input_frame = tk.Frame(frame, bg="#ecf0f1")
         input_frame.pack(pady=20)
         
         # Player name input
@@ -110,9 +204,9 @@ class NumberSequenceGame:
             bg="#ecf0f1"
         ).grid(row=0, column=0, padx=5, pady=5, sticky="e")
         
-        name_entry = tk.Entry(input_frame, font=("Arial", 11), width=20)
-        name_entry.grid(row=0, column=1, padx=5, pady=5)
-        name_entry.insert(0, "Player")
+        self.name_entry = tk.Entry(input_frame, font=("Arial", 11), width=20)
+        self.name_entry.grid(row=0, column=1, padx=5, pady=5)
+        self.name_entry.insert(0, "Player")
         
         # Number of circles selection
         tk.Label(
@@ -122,10 +216,10 @@ class NumberSequenceGame:
             bg="#ecf0f1"
         ).grid(row=1, column=0, padx=5, pady=5, sticky="e")
         
-        numbers_var = tk.StringVar(value="10")
+        self.numbers_var = tk.StringVar(value="10")
         numbers_combo = ttk.Combobox(
             input_frame,
-            textvariable=numbers_var,
+            textvariable=self.numbers_var,
             values=["5", "10", "15", "20"],
             state="readonly",
             width=18,
@@ -135,12 +229,12 @@ class NumberSequenceGame:
         
         # Start button
         def start_game():
-            self.player_name = name_entry.get().strip() or "Player"
-            self.numbers_count = int(numbers_var.get())
+            self.player_name = self.name_entry.get().strip() or "Player"
+            self.numbers_count = int(self.numbers_var.get())
             self.show_game_screen()
         
         start_button = tk.Button(
-            self.main_frame,
+            frame,
             text="Start Game",
             font=("Arial", 16, "bold"),
             bg="#27ae60",
@@ -153,12 +247,8 @@ class NumberSequenceGame:
         start_button.pack(pady=20)
         
         # Leaderboard
-        self.show_leaderboard_on_start()
-    
-    def show_leaderboard_on_start(self):
-        """Display leaderboard on the start screen."""
         leaderboard_frame = tk.LabelFrame(
-            self.main_frame,
+            frame,
             text="🏆 Top 10 Fastest Times",
             font=("Arial", 14, "bold"),
             bg="#ecf0f1",
@@ -167,77 +257,103 @@ class NumberSequenceGame:
             pady=10
         )
         leaderboard_frame.pack(pady=20, padx=20, fill=tk.BOTH, expand=True)
+        self.start_leaderboard = self.create_leaderboard_tree(leaderboard_frame)
         
-        # Create a frame with scrollbar for leaderboard
-        canvas_frame = tk.Frame(leaderboard_frame, bg="#ecf0f1")
-        canvas_frame.pack(fill=tk.BOTH, expand=True)
-        
-        leaderboard = self.db.get_leaderboard(limit=10)
-        
-        if leaderboard:
-            # Headers
-            headers_frame = tk.Frame(canvas_frame, bg="#ecf0f1")
-            headers_frame.pack(fill=tk.X, pady=5)
-            
-            tk.Label(headers_frame, text="Rank", font=("Arial", 10, "bold"), 
-                    bg="#ecf0f1", width=6).pack(side=tk.LEFT)
-            tk.Label(headers_frame, text="Player", font=("Arial", 10, "bold"), 
-                    bg="#ecf0f1", width=15).pack(side=tk.LEFT)
-            tk.Label(headers_frame, text="Time", font=("Arial", 10, "bold"), 
-                    bg="#ecf0f1", width=10).pack(side=tk.LEFT)
-            tk.Label(headers_frame, text="Circles", font=("Arial", 10, "bold"), 
-                    bg="#ecf0f1", width=8).pack(side=tk.LEFT)
-            tk.Label(headers_frame, text="Date", font=("Arial", 10, "bold"), 
-                    bg="#ecf0f1", width=18).pack(side=tk.LEFT)
-            
-            # Leaderboard entries
-            for idx, (name, time_sec, num_circles, timestamp) in enumerate(leaderboard, 1):
-                entry_frame = tk.Frame(canvas_frame, bg="white", relief=tk.RAISED, bd=1)
-                entry_frame.pack(fill=tk.X, pady=2)
-                
-                tk.Label(entry_frame, text=f"#{idx}", font=("Arial", 10), 
-                        bg="white", width=6).pack(side=tk.LEFT)
-                tk.Label(entry_frame, text=name, font=("Arial", 10), 
-                        bg="white", width=15, anchor="w").pack(side=tk.LEFT)
-                tk.Label(entry_frame, text=f"{time_sec:.2f}s", font=("Arial", 10), 
-                        bg="white", width=10).pack(side=tk.LEFT)
-                tk.Label(entry_frame, text=str(num_circles), font=("Arial", 10), 
-                        bg="white", width=8).pack(side=tk.LEFT)
-                
-                # Format timestamp
-                timestamp_str = timestamp.split('.')[0] if '.' in timestamp else timestamp
-                tk.Label(entry_frame, text=timestamp_str, font=("Arial", 9), 
-                        bg="white", width=18).pack(side=tk.LEFT)
-        else:
-            tk.Label(
-                canvas_frame,
-                text="No records yet. Be the first!",
-                font=("Arial", 11, "italic"),
-                bg="#ecf0f1",
-                fg="#7f8c8d"
-            ).pack(pady=20)
+        return frame
     
-    def show_game_screen(self):
-        """Display the main game screen."""
-        self.clear_screen()
+    def create_leaderboard_tree(self, parent: tk.Widget) -> ttk.Treeview:
+        """Create a leaderboard table with a scrollbar."""
+        columns = ("rank", "player", "time", "circles", "date")
+        tree = ttk.Treeview(parent, columns=columns, show="headings", height=10)
+        
+        tree.heading("rank", text="Rank")
+        tree.heading("player", text="Player")
+        tree.heading("time", text="Time")
+        tree.heading("circles", text="Circles")
+        tree.heading("date", text="Date")
+        
+        tree.column("rank", width=60, anchor="center")
+        tree.column("player", width=180, anchor="w")
+        tree.column("time", width=100, anchor="center")
+        tree.column("circles", width=80, anchor="center")
+        tree.column("date", width=180, anchor="center")
+        
+        # Highlight the player's new score
+        tree.tag_configure("highlight", background="#fff9c4")
+        
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        return tree
+    
+    def update_leaderboard_tree(self, tree: ttk.Treeview, leaderboard: List[Tuple],
+                                player_time: float = None, empty_text: str = "No records yet."):
+        """Update leaderboard rows in place, reusing existing items."""
+        rows = []
+        for idx, (name, time_sec, num_circles, timestamp) in enumerate(leaderboard, 1):
+            # Format timestamp
+            timestamp_str = str(timestamp)
+            timestamp_str = timestamp_str.split('.')[0] if '.' in timestamp_str else timestamp_str
+            
+            highlight = (player_time is not None and abs(time_sec - player_time) < 0.01
+                         and name == self.player_name)
+            rows.append(((f"#{idx}", name, f"{time_sec:.2f}s", num_circles, timestamp_str),
+                         ("highlight",) if highlight else ()))
+        
+        if not rows:
+            rows.append((("", empty_text, "", "", ""), ()))
+        
+        items = tree.get_children()
+        for idx, (values, tags) in enumerate(rows):
+            if idx < len(items):
+                tree.item(items[idx], values=values, tags=tags)
+            else:
+                tree.insert("", tk.END, values=values, tags=tags)
         
-        self.main_frame = tk.Frame(self.root, bg="#ecf0f1")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        if len(items) > len(rows):
+            tree.delete(*items[len(rows):])
+    
+    def show_start_screen(self):
+        """Display the start screen with options and leaderboard."""
+        self.switch_screen(self.start_frame)
+        self.show_leaderboard_on_start()
+    
+    def show_leaderboard_on_start(self):
+        """Refresh the leaderboard on the start screen."""
+        tree = self.start_leaderboard
+        self.show_leaderboard_message(tree, "Loading leaderboard...")
+        self.db.submit(
+            "get_leaderboard", limit=10,
+            callback=lambda leaderboard: self.update_leaderboard_tree(
+                tree, leaderboard, empty_text="No records yet. Be the first!"),
+            on_error=lambda exc: self.show_leaderboard_message(
+                tree, "Failed to load leaderboard")
+        )
+    
+    def show_leaderboard_message(self, tree: ttk.Treeview, text: str):
+        """Replace the leaderboard rows with a single status message."""
+        self.update_leaderboard_tree(tree, [], empty_text=text)
+    
+    def build_game_screen(self) -> tk.Frame:
+        """Build the main game screen."""
+        frame = tk.Frame(self.root, bg="#ecf0f1")
         
         # Top info bar
-        info_frame = tk.Frame(self.main_frame, bg="#34495e", height=60)
+        info_frame = tk.Frame(frame, bg="#34495e", height=60)
         info_frame.pack(fill=tk.X)
         info_frame.pack_propagate(False)
         
         # Player info
-        player_label = tk.Label(
+        self.player_label = tk.Label(
             info_frame,
-            text=f"Player: {self.player_name}",
+            text="Player:",
             font=("Arial", 12),
             bg="#34495e",
             fg="white"
         )
-        player_label.pack(side=tk.LEFT, padx=20, pady=10)
+        self.player_label.pack(side=tk.LEFT, padx=20, pady=10)
         
         # Timer
         self.timer_label = tk.Label(
@@ -252,7 +368,7 @@ class NumberSequenceGame:
         # Hint
         self.hint_label = tk.Label(
             info_frame,
-            text=f"Next: {self.current_number}",
+            text="Next: 1",
             font=("Arial", 12),
             bg="#34495e",
             fg="#2ecc71"
@@ -261,7 +377,7 @@ class NumberSequenceGame:
         
         # Canvas for game
         self.canvas = tk.Canvas(
-            self.main_frame,
+            frame,
             width=self.canvas_width,
             height=self.canvas_height,
             bg="#ecf0f1",
@@ -271,7 +387,7 @@ class NumberSequenceGame:
         self.canvas.bind("<Button-1>", self.on_canvas_click)
         
         # Bottom frame with quit button
-        bottom_frame = tk.Frame(self.main_frame, bg="#ecf0f1")
+        bottom_frame = tk.Frame(frame, bg="#ecf0f1")
         bottom_frame.pack(pady=10)
         
         quit_button = tk.Button(
@@ -287,131 +403,119 @@ class NumberSequenceGame:
         )
         quit_button.pack()
         
+        return frame
+    
+    def show_game_screen(self):
+        """Display the main game screen and start a new game."""
+        self.player_label.config(text=f"Player: {self.player_name}")
+        self.timer_label.config(text="Time: 0.00s")
+        self.hint_label.config(text="Next: 1")
+        self.switch_screen(self.game_frame)
+        
         # Initialize game
         self.initialize_game()
     
     def initialize_game(self):
         """Set up the game with random circle positions."""
-        self.circles = []
-        self.current_number = 1
+        padding = self.circle_radius + 10
+        circles = generate_circles(
+            self.numbers_count, self.canvas_width, self.canvas_height,
+            radius=self.circle_radius,
+            safe_area={
+                'minX': padding,
+                'maxX': self.canvas_width - padding,
+                'minY': padding,
+                'maxY': self.canvas_height - padding
+            }
+        )
+        self.session = GameSession(circles, player_name=self.player_name)
         self.game_active = True
-        self.start_time = time.time()
-        
-        # Generate circles with random positions
-        for i in range(1, self.numbers_count + 1):
-            max_attempts = 100
-            for attempt in range(max_attempts):
-                x = random.randint(self.circle_radius + 10, 
-                                 self.canvas_width - self.circle_radius - 10)
-                y = random.randint(self.circle_radius + 10, 
-                                 self.canvas_height - self.circle_radius - 10)
-                
-                circle = Circle(x, y, i, self.circle_radius)
-                
-                # Check for overlaps
-                overlap = False
-                for existing_circle in self.circles:
-                    if circle.overlaps_with(existing_circle):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    self.circles.append(circle)
-                    break
-            else:
-                # If we couldn't find a non-overlapping position, just place it anyway
-                self.circles.append(circle)
         
         # Draw all circles
         self.draw_circles()
         
         # Start timer update
+        if self.timer_job is not None:
+            self.root.after_cancel(self.timer_job)
+            self.timer_job = None
         self.update_timer()
     
     def draw_circles(self):
-        """Draw all circles on the canvas."""
-        for circle in self.circles:
-            if not circle.clicked:
-                # Draw circle
-                x1 = circle.x - circle.radius
-                y1 = circle.y - circle.radius
-                x2 = circle.x + circle.radius
-                y2 = circle.y + circle.radius
-                
-                circle.canvas_id = self.canvas.create_oval(
-                    x1, y1, x2, y2,
-                    fill=self.circle_color,
-                    outline="#2980b9",
-                    width=2
-                )
-                
-                # Draw number
-                circle.text_id = self.canvas.create_text(
+        """Draw all circles, reusing canvas items from previous games."""
+        circles = self.session.circles
+        for idx, circle in enumerate(circles):
+            x1 = circle.x - circle.radius
+            y1 = circle.y - circle.radius
+            x2 = circle.x + circle.radius
+            y2 = circle.y + circle.radius
+            
+            if idx < len(self.circle_items):
+                # Move and restyle an existing circle and number
+                oval_id, text_id = self.circle_items[idx]
+                self.canvas.coords(oval_id, x1, y1, x2, y2)
+                self.canvas.coords(text_id, circle.x, circle.y)
+            else:
+                oval_id = self.canvas.create_oval(x1, y1, x2, y2, width=2)
+                text_id = self.canvas.create_text(
                     circle.x, circle.y,
-                    text=str(circle.number),
                     font=("Arial", 16, "bold"),
                     fill=self.text_color
                 )
+                self.circle_items.append((oval_id, text_id))
+            
+            self.canvas.itemconfig(oval_id, fill=self.circle_color, outline="#2980b9",
+                                   state=tk.NORMAL)
+            self.canvas.itemconfig(text_id, text=str(circle.number), state=tk.NORMAL)
+        
+        # Hide items left over from larger boards
+        for oval_id, text_id in self.circle_items[len(circles):]:
+            self.canvas.itemconfig(oval_id, state=tk.HIDDEN)
+            self.canvas.itemconfig(text_id, state=tk.HIDDEN)
     
     def on_canvas_click(self, event):
         """Handle canvas click events."""
         if not self.game_active:
             return
         
-        # Check if any circle was clicked
-        clicked_circle = None
-        for circle in self.circles:
-            if not circle.clicked and circle.contains_point(event.x, event.y):
-                clicked_circle = circle
-                break
+        result, clicked_circle = self.session.click(event.x, event.y)
         
         # If no circle was clicked (empty space), do nothing
-        if clicked_circle is None:
+        if result == EMPTY:
             return
         
-        # Check if it's the correct number
-        if clicked_circle.number == self.current_number:
-            # Correct click
+        if result == CORRECT:
             self.mark_circle_clicked(clicked_circle)
-            self.current_number += 1
-            
-            # Update hint
-            if self.hint_label:
-                if self.current_number <= self.numbers_count:
-                    self.hint_label.config(text=f"Next: {self.current_number}")
-                else:
-                    self.hint_label.config(text="Almost done!")
-            
-            # Check if game is complete
-            if self.current_number > self.numbers_count:
-                self.game_complete()
+            self.hint_label.config(text=f"Next: {self.session.current_number}")
+        elif result == COMPLETE:
+            self.mark_circle_clicked(clicked_circle)
+            self.hint_label.config(text="Almost done!")
+            self.game_complete()
         else:
             # Wrong click - game over
             self.game_over()
     
     def mark_circle_clicked(self, circle: Circle):
-        """Mark a circle as clicked (change its appearance)."""
-        circle.clicked = True
-        
-        # Change color to indicate it's done
-        if circle.canvas_id:
-            self.canvas.itemconfig(circle.canvas_id, fill=self.clicked_color, 
-                                  outline="#27ae60")
+        """Change a clicked circle's appearance to indicate it's done."""
+        # Circles are numbered from 1 in board order, matching circle_items
+        oval_id, _ = self.circle_items[circle.number - 1]
+        self.canvas.itemconfig(oval_id, fill=self.clicked_color, outline="#27ae60")
     
     def update_timer(self):
         """Update the timer display."""
-        if self.game_active and self.timer_label:
-            elapsed = time.time() - self.start_time
+        if self.game_active:
+            elapsed = self.session.elapsed()
             self.timer_label.config(text=f"Time: {elapsed:.2f}s")
-            self.root.after(50, self.update_timer)  # Update every 50ms
+            self.timer_job = self.root.after(50, self.update_timer)  # Update every 50ms
+        else:
+            self.timer_job = None
     
     def game_complete(self):
         """Handle successful game completion."""
         self.game_active = False
-        elapsed = time.time() - self.start_time
+        elapsed = self.session.elapsed()
         
         # Save to database
-        self.db.save_result(self.player_name, elapsed, self.numbers_count, True)
+        self.db.submit("save_result", self.player_name, elapsed, self.numbers_count, True)
         
         # Show success message
         self.show_result_screen(
@@ -423,38 +527,35 @@ class NumberSequenceGame:
     def game_over(self):
         """Handle game over (wrong number clicked)."""
         self.game_active = False
-        elapsed = time.time() - self.start_time
+        elapsed = self.session.elapsed()
         
         # Save to database
-        self.db.save_result(self.player_name, elapsed, self.numbers_count, False)
+        self.db.submit("save_result", self.player_name, elapsed, self.numbers_count, False)
         
         # Show failure message
         self.show_result_screen(
             success=False,
             time_seconds=elapsed,
-            message=f"❌ Game Over!\n\nYou clicked the wrong number.\nYou needed: {self.current_number}\nTime: {elapsed:.2f} seconds"
+            message=f"❌ Game Over!\n\nYou clicked the wrong number.\nYou needed: {self.session.current_number}\nTime: {elapsed:.2f} seconds"
         )
     
-    def show_result_screen(self, success: bool, time_seconds: float, message: str):
-        """Display the result screen after game ends."""
-        self.clear_screen()
-        
-        self.main_frame = tk.Frame(self.root, bg="#ecf0f1")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
+    def build_result_screen(self) -> tk.Frame:
+        """Build the result screen shown after a game ends."""
+        frame = tk.Frame(self.root, bg="#ecf0f1")
         
         # Result message
-        result_label = tk.Label(
-            self.main_frame,
-            text=message,
+        self.result_label = tk.Label(
+            frame,
+            text="",
             font=("Arial", 16),
             bg="#ecf0f1",
             fg="#2c3e50",
             justify=tk.CENTER
         )
-        result_label.pack(pady=40)
+        self.result_label.pack(pady=40)
         
         # Buttons frame
-        buttons_frame = tk.Frame(self.main_frame, bg="#ecf0f1")
+        buttons_frame = tk.Frame(frame, bg="#ecf0f1")
         buttons_frame.pack(pady=20)
         
         # Play again button
@@ -485,13 +586,9 @@ class NumberSequenceGame:
         )
         menu_button.pack(side=tk.LEFT, padx=10)
         
-        # Show leaderboard
-        self.show_leaderboard_on_result(time_seconds if success else None)
-    
-    def show_leaderboard_on_result(self, player_time: float = None):
-        """Display leaderboard on result screen."""
+        # Leaderboard
         leaderboard_frame = tk.LabelFrame(
-            self.main_frame,
+            frame,
             text="🏆 Top 10 Leaderboard",
             font=("Arial", 14, "bold"),
             bg="#ecf0f1",
@@ -500,55 +597,52 @@ class NumberSequenceGame:
             pady=10
         )
         leaderboard_frame.pack(pady=20, padx=20, fill=tk.BOTH, expand=True)
+        self.result_leaderboard = self.create_leaderboard_tree(leaderboard_frame)
         
-        leaderboard = self.db.get_leaderboard(limit=10)
+        return frame
+    
+    def show_result_screen(self, success: bool, time_seconds: float, message: str):
+        """Display the result screen after game ends."""
+        self.result_label.config(text=message)
+        self.switch_screen(self.result_frame)
         
-        if leaderboard:
-            # Create scrollable frame
-            canvas_frame = tk.Frame(leaderboard_frame, bg="#ecf0f1")
-            canvas_frame.pack(fill=tk.BOTH, expand=True)
-            
-            for idx, (name, time_sec, num_circles, timestamp) in enumerate(leaderboard, 1):
-                # Highlight player's new score if applicable
-                bg_color = "#fff9c4" if (player_time and abs(time_sec - player_time) < 0.01 
-                                        and name == self.player_name) else "white"
-                
-                entry_frame = tk.Frame(canvas_frame, bg=bg_color, relief=tk.RAISED, bd=1)
-                entry_frame.pack(fill=tk.X, pady=2)
-                
-                entry_text = f"#{idx}  {name}  -  {time_sec:.2f}s  -  {num_circles} circles"
-                tk.Label(
-                    entry_frame,
-                    text=entry_text,
-                    font=("Arial", 10),
-                    bg=bg_color,
-                    anchor="w"
-                ).pack(fill=tk.X, padx=10, pady=5)
-        else:
-            tk.Label(
-                canvas_frame,
-                text="No records yet.",
-                font=("Arial", 11, "italic"),
-                bg="#ecf0f1",
-                fg="#7f8c8d"
-            ).pack(pady=20)
+        # Show leaderboard
+        self.show_leaderboard_on_result(time_seconds if success else None)
+    
+    def show_leaderboard_on_result(self, player_time: float = None):
+        """Refresh the leaderboard on the result screen."""
+        tree = self.result_leaderboard
+        self.show_leaderboard_message(tree, "Loading leaderboard...")
+        self.db.submit(
+            "get_leaderboard", limit=10,
+            callback=lambda leaderboard: self.update_leaderboard_tree(
+                tree, leaderboard, player_time=player_time),
+            on_error=lambda exc: self.show_leaderboard_message(
+                tree, "Failed to load leaderboard")
+        )
     
     def quit_to_menu(self):
         """Quit current game and return to menu."""
         if self.game_active:
             # Save incomplete game
-            elapsed = time.time() - self.start_time
-            self.db.save_result(self.player_name, elapsed, self.numbers_count, False)
+            self.session.abandon()
+            elapsed = self.session.elapsed()
+            self.db.submit("save_result", self.player_name, elapsed, self.numbers_count, False)
         
         self.game_active = False
         self.show_start_screen()
     
-    def clear_screen(self):
-        """Clear all widgets from the screen."""
-        if self.main_frame:
-            self.main_frame.destroy()
-            self.main_frame = None
-        
-        self.canvas = None
-        self.timer_label = None
-        self.hint_label = None
+    def on_close(self):
+        """Flush queued saves before closing the window."""
+        self.game_active = False
+        self.root.title("Number Sequence Speed Test - saving...")
+        self.db.shutdown(self.finish_close)
+    
+    def finish_close(self, unsaved: int):
+        """Close the window once queued saves are done or have timed out."""
+        if unsaved:
+            messagebox.showwarning(
+                "Results Not Saved",
+                f"{unsaved} game result(s) could not be saved to the database."
+            )
+        self.root.destroy()
@@ -0,0 +1,214 @@
+"""
+In-memory top-K leaderboards for today, this week and all time.
+
+The tracker holds the fastest ``size`` completions per circle count in each
+window. Results are added as they are saved, so serving any window costs
+O(K) however long the history is. The day and week boards remember which
+period they cover and start over when a result from a newer period
+arrives; until then, reads of a board whose period has ended return
+nothing. Boards are checkpointed to the leaderboard_summaries table and
+restored from there on restart.
+
+When a result enters a board the tracker produces a small diff (the window,
+the rank it took and the entry), which is what the live leaderboard stream
+sends to clients instead of the whole leaderboard.
+"""
+
+import bisect
+import json
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from consumer import ResultConsumer, as_datetime
+
+WINDOWS = ('day', 'week', 'all')
+
+# (time_seconds, result_id, player_name, timestamp); sorts fastest first, ties by ID
+Entry = Tuple[float, int, str, str]
+
+
+def period_start(window: str, moment: datetime) -> Optional[date]:
+    """First day of the window's period containing moment (None for all-time)."""
+    if window == 'day':
+        return moment.date()
+    if window == 'week':
+        day = moment.date()
+        return day - timedelta(days=day.weekday())
+    return None
+
+
+class Board:
+    """One window's top-K for one circle count."""
+    
+    def __init__(self, period: Optional[date] = None, entries: List[Entry] = None):
+        self.period = period
+        self.entries: List[Entry] = entries or []
+    
+    def to_dict(self) -> dict:
+        return {
+            'period': self.period.isoformat() if self.period else None,
+            'entries': [list(entry) for entry in self.entries]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Board':
+        period = date.fromisoformat(data['period']) if data['period'] else None
+        return cls(period, [tuple(entry) for entry in data['entries']])
+
+
+class LeaderboardTracker(ResultConsumer):
+    """Windowed top-K completions per circle count, checkpointed to the database."""
+    
+    def __init__(self, db, size: int = 10, on_change: Callable[[dict], None] = None,
+                 checkpoint_every: int = 20, checkpoint_interval: float = 60.0,
+                 settle_seconds: float = 0.0):
+        """
+        Args:
+            db: GameDatabase to warm from and checkpoint to
+            size: Entries kept per board
+            on_change: Called with each diff while the tracker's lock is held,
+                       so diffs are delivered in order and never interleave
+                       with snapshot()
+            checkpoint_every: Checkpoint after this many board changes...
+            checkpoint_interval: ...or this many seconds, whichever comes first
+            settle_seconds: See ResultConsumer
+        """
+        super().__init__(db, checkpoint_every, checkpoint_interval, settle_seconds)
+        self.size = size
+        self.on_change = on_change
+        # boards[window][numbers_count]
+        self.boards: Dict[str, Dict[int, Board]] = {window: {} for window in WINDOWS}
+    
+    def _restore(self) -> bool:
+        """Load the boards from the last checkpoint.
+        
+        Without a checkpoint they are built from the all-time leaderboard
+        and this week's completed results.
+        """
+        summaries = self.db.load_leaderboard_summaries()
+        if summaries:
+            for numbers_count, payload, last_id in summaries:
+                data = json.loads(payload)
+                for window in WINDOWS:
+                    self.boards[window][numbers_count] = Board.from_dict(data[window])
+                self.applied.update(data.get('applied', []))
+                self.last_result_id = max(self.last_result_id, last_id)
+            return True
+        
+        last_id, grouped = self.db.get_top_results_snapshot(limit_per_group=self.size)
+        for numbers_count, rows in grouped.items():
+            for row_id, name, time_seconds, timestamp in rows:
+                self._insert(row_id, name, numbers_count, time_seconds,
+                             as_datetime(timestamp), notify=False)
+        week_start = datetime.combine(period_start('week', datetime.now()),
+                                      datetime.min.time())
+        for row_id, name, time_seconds, numbers_count, timestamp in \
+                self.db.iter_completed_since(week_start):
+            self._insert(row_id, name, numbers_count, time_seconds,
+                         as_datetime(timestamp), notify=False)
+        # Results above the settled ID are read again by the catch-up, which
+        # is harmless: _insert() skips results already on a board
+        settled_id = self._last_settled_id()
+        self.last_result_id = last_id if settled_id is None else min(last_id, settled_id)
+        return False
+    
+    def _results_after(self, last_id: int):
+        while True:
+            rows = self.db.get_completed_after(last_id)
+            if not rows:
+                return
+            for result_id, name, time_seconds, numbers_count, timestamp in rows:
+                timestamp = as_datetime(timestamp)
+                yield result_id, timestamp, (name, numbers_count, time_seconds, timestamp)
+                last_id = result_id
+    
+    def _apply(self, result_id: int, player_name: str, numbers_count: int,
+               time_seconds: float, timestamp: datetime, notify: bool = True) -> List[dict]:
+        return self._insert(result_id, player_name, numbers_count, time_seconds,
+                            timestamp, notify=notify)
+    
+    def add(self, result_id: int, player_name: str, numbers_count: int,
+            time_seconds: float, timestamp: datetime = None) -> List[dict]:
+        """
+        Record a completed game, checkpointing when one is due.
+        
+        Returns:
+            A diff for each board the result entered
+        """
+        return super().add(result_id, player_name, numbers_count, time_seconds,
+                           timestamp or datetime.now()) or []
+    
+    def _insert(self, result_id: int, player_name: str, numbers_count: int,
+                time_seconds: float, timestamp: datetime, notify: bool = True) -> List[dict]:
+        """Add a result to every board it qualifies for. Call with the lock held."""
+        entry = (time_seconds, result_id, player_name, timestamp.isoformat(sep=' '))
+        diffs = []
+        for window in WINDOWS:
+            period = period_start(window, timestamp)
+            board = self.boards[window].get(numbers_count)
+            if board is None or (period is not None and period > board.period):
+                # First result for this circle count, or the window rolled over
+                board = self.boards[window][numbers_count] = Board(period)
+            elif period != board.period:
+                # From a period that has already ended
+                continue
+            
+            entries = board.entries
+            if any(existing[1] == result_id for existing in entries):
+                continue
+            if len(entries) >= self.size and entry >= entries[-1]:
+                continue
+            
+            rank = bisect.bisect_left(entries, entry) + 1
+            entries.insert(rank - 1, entry)
+            del entries[self.size:]
+            self.pending += 1
+            
+            diff = {
+                'window': window,
+                'numbers_count': numbers_count,
+                'rank': rank,
+                'entry': {'name': player_name, 'time': round(time_seconds, 2)},
+                'size': self.size
+            }
+            diffs.append(diff)
+            if notify and self.on_change:
+                self.on_change(diff)
+        return diffs
+    
+    def _checkpoint_data(self):
+        # _insert() creates every window's board for a circle count at once
+        applied = sorted(self.applied)
+        return [
+            (numbers_count,
+             json.dumps(dict({window: self.boards[window][numbers_count].to_dict()
+                              for window in WINDOWS}, applied=applied)),
+             self.last_result_id)
+            for numbers_count in sorted(self.boards['all'])
+        ]
+    
+    def _save_checkpoint(self, data):
+        self.db.save_leaderboard_summaries(data)
+    
+    def _current(self, window: str, numbers_count: int) -> List[Entry]:
+        """A board's entries, or none if its period has ended. Call with the lock held."""
+        board = self.boards[window].get(numbers_count)
+        if board is None or board.period != period_start(window, datetime.now()):
+            return []
+        return board.entries
+    
+    def top(self, window: str, numbers_count: int) -> List[dict]:
+        """The current leaderboard for one window and circle count."""
+        with self.lock:
+            return [{'name': name, 'time': round(time_seconds, 2), 'timestamp': timestamp}
+                    for time_seconds, _, name, timestamp in self._current(window, numbers_count)]
+    
+    def snapshot(self, window: str = 'all') -> dict:
+        """Every current leaderboard in a window, shaped like /api/leaderboard?grouped=true."""
+        with self.lock:
+            grouped = {}
+            for numbers_count in sorted(self.boards[window]):
+                entries = self.top(window, numbers_count)
+                if entries:
+                    grouped[numbers_count] = entries
+            return grouped
@@ -2,104 +2,198 @@
 Main entry point for the Number Sequence Speed Test web application.
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session
 from database import GameDatabase
+from engine import COMPLETE, EMPTY, WRONG, GameSession, generate_circles
+from replay import ReplayLog, decode_replay
+from ranking import RankService
+from stats import StatsService
+from admission import AdmissionController
+from sharding import make_game_id
+from sequencing import DUPLICATE, OUT_OF_ORDER, ClickSequence
+from broadcast import Broadcaster
+from leaderboards import WINDOWS, LeaderboardTracker
+import os
 import secrets
+import threading
 import time
-import random
+import json
+import base64
 import math
+from datetime import datetime
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)
-db = GameDatabase()
+# Worker processes share SECRET_KEY so a session cookie is valid on any shard
+app.secret_key = os.environ.get('SECRET_KEY') or secrets.token_hex(16)
+
+# Shard this process owns when run by supervisor.py. Game IDs carry the shard
+# so the dispatcher can route clicks back to the process holding the game.
+SHARD_ID = int(os.environ.get('SHARD_ID', 0))
+SHARD_COUNT = int(os.environ.get('SHARD_COUNT', 1))
+
+# With several processes writing results, the in-memory rank and statistics
+# services catch up from the database instead of recording results locally.
+# Set SHARED_RESULTS=true whenever anything else writes to the same database
+# (several instances or containers, the desktop client, simulate.py --persist).
+SHARED_RESULTS = os.environ.get('SHARED_RESULTS',
+                                'true' if SHARD_COUNT > 1 else 'false').lower() == 'true'
+
+# Another process can commit a result a little after timestamping it, so
+# the services keep tracking results this recent by ID rather than assume
+# nothing older is still to come
+RESULTS_SETTLE_SECONDS = float(os.environ.get('RESULTS_SETTLE_SECONDS',
+                                              5 if SHARED_RESULTS else 0))
+
+# With LAZY_INIT (the default) importing this module doesn't touch the
+# database: the connection, schema check and warm-up happen in the
+# background, or on first use if a request arrives before they finish
+LAZY_INIT = os.environ.get('LAZY_INIT', 'true').lower() == 'true'
+db = GameDatabase(lazy=LAZY_INIT)
+
+# Largest board a client may ask for. Every circle count gets its own rank,
+# statistics and leaderboard state, so the range is bounded.
+MAX_CIRCLES = int(os.environ.get('MAX_CIRCLES', 100))
+
+# Replicas can lag the primary: for this long after a player saves a result,
+# their reads go to the primary so they always see their own results
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+# Order-statistic index over completed times, for O(log n) rank lookups
+rank_service = RankService(db, settle_seconds=RESULTS_SETTLE_SECONDS)
+
+# Streaming quantile sketches per circle count, checkpointed to the database
+stats_service = StatsService(db, settle_seconds=RESULTS_SETTLE_SECONDS)
+
+# Today's, this week's and all-time top 10 per circle count are kept in
+# memory; each all-time change is pushed once to every client subscribed to
+# the event stream
+broadcaster = Broadcaster(buffer_size=int(os.environ.get('LIVE_BUFFER_SIZE', 64)),
+                          max_subscribers=int(os.environ.get('LIVE_MAX_SUBSCRIBERS', 1000)))
+
+
+def publish_leaderboard_diff(diff: dict):
+    """Send an all-time board change to stream subscribers.
+    
+    The stream's snapshot only covers the all-time boards, so day and week
+    diffs would have nothing to apply to and would only fill client buffers.
+    """
+    if diff['window'] == 'all':
+        broadcaster.publish('leaderboard', diff)
+
+
+leaderboard_tracker = LeaderboardTracker(db, size=10, on_change=publish_leaderboard_diff,
+                                         settle_seconds=RESULTS_SETTLE_SECONDS)
+
+# How often each process picks up results saved by other writers
+RESULTS_POLL_SECONDS = float(os.environ.get('RESULTS_POLL_SECONDS',
+                                            os.environ.get('LEADERBOARD_POLL_SECONDS', 2)))
+
+
+def warm_up():
+    """Check the schema and warm the in-memory services."""
+    db.ensure_schema()
+    rank_service.ensure_warm()
+    stats_service.ensure_warm()
+    leaderboard_tracker.ensure_warm()
+
+
+def follow_results():
+    """Apply results saved by other writers and push their records to subscribers.
+    
+    Runs in every mode: with SHARED_RESULTS off this process records its own
+    results directly, and the catch-up skips them.
+    """
+    while True:
+        time.sleep(RESULTS_POLL_SECONDS)
+        for service in (rank_service, stats_service, leaderboard_tracker):
+            try:
+                service.refresh()
+            except Exception as exc:
+                print(f"{type(service).__name__} refresh failed: {exc}")
+
+
+if LAZY_INIT:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+else:
+    warm_up()
+
+threading.Thread(target=follow_results, name="results", daemon=True).start()
+
+# Admission control: clicks from games in progress are admitted before new
+# games, and both before leaderboard/statistics reads. Requests that would
+# queue past their latency budget get an immediate 503 with Retry-After.
+admission = AdmissionController(
+    total_slots=int(os.environ.get('ADMISSION_SLOTS', 32)),
+    enabled=os.environ.get('ADMISSION_CONTROL', 'true').lower() == 'true'
+)
+admission.add_route('click', priority=0, max_concurrent=32, max_queue=128, max_wait=2.0)
+admission.add_route('start', priority=1, max_concurrent=8, max_queue=32, max_wait=0.5)
+admission.add_route('read', priority=2, max_concurrent=4, max_queue=16, max_wait=0.25)
 
 # Store active games in memory (in production, use Redis or similar)
 # TODO: Add cleanup mechanism for stale game sessions (TTL-based)
 active_games = {}
 
 
-class Circle:
-    """Represents a numbered circle in the game."""
-    
-    def __init__(self, x: float, y: float, number: int, radius: int = 30):
-        self.x = x
-        self.y = y
-        self.number = number
-        self.radius = radius
-        self.clicked = False
-    
-    def contains_point(self, px: float, py: float) -> bool:
-        """Check if a point is inside this circle."""
-        distance = math.sqrt((px - self.x) ** 2 + (py - self.y) ** 2)
-        return distance <= self.radius
-    
-    def overlaps_with(self, other: 'Circle') -> bool:
-        """Check if this circle overlaps with another circle."""
-        distance = math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
-        return distance < (self.radius + other.radius + 10)
-    
-    def to_dict(self):
-        """Convert circle to dictionary for JSON serialization."""
-        return {
-            'x': self.x,
-            'y': self.y,
-            'number': self.number,
-            'radius': self.radius,
-            'clicked': self.clicked
-        }
+def encode_cursor(*values) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor token."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def cursor_time(value) -> float:
+    """A completion time from a cursor."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError('Invalid cursor')
+    return float(value)
+
+
+def cursor_id(value) -> int:
+    """A result ID from a cursor."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError('Invalid cursor')
+    return value
+
 
+def cursor_timestamp(value) -> str:
+    """A result timestamp from a cursor, as ISO text."""
+    if not isinstance(value, str):
+        raise ValueError('Invalid cursor')
+    datetime.fromisoformat(value)
+    return value
 
-def generate_circles(count: int, width: int, height: int, radius: int = 30, safe_area: dict = None):
-    """Generate non-overlapping circles at random positions within safe area."""
-    circles = []
+
+def decode_cursor(token: str, *fields) -> tuple:
+    """Decode a cursor token back into its keyset position.
     
-    # Use safe area if provided, otherwise add basic padding
-    if safe_area:
-        min_x = safe_area.get('minX', radius + 20)
-        max_x = safe_area.get('maxX', width - radius - 20)
-        min_y = safe_area.get('minY', radius + 20)
-        max_y = safe_area.get('maxY', height - radius - 20)
-    else:
-        min_x = radius + 20
-        max_x = width - radius - 20
-        min_y = radius + 20
-        max_y = height - radius - 20
-    
-    # Ensure we have valid boundaries
-    if max_x <= min_x or max_y <= min_y:
-        # Invalid safe area boundaries - log warning and use conservative defaults
-        print(f"Warning: Invalid safe_area boundaries received. Using defaults. "
-              f"min_x={min_x}, max_x={max_x}, min_y={min_y}, max_y={max_y}")
-        # Use conservative boundaries to ensure circles stay in safe area
-        min_x = max(radius + 40, min_x) if min_x > 0 else radius + 40
-        max_x = min(width - radius - 40, max_x) if max_x > 0 else width - radius - 40
-        min_y = max(radius + 100, min_y) if min_y > 0 else radius + 100  # Extra space for header
-        max_y = min(height - radius - 120, max_y) if max_y > 0 else height - radius - 120  # Extra space for footer
-    
-    for i in range(1, count + 1):
-        max_attempts = 100
-        for attempt in range(max_attempts):
-            # Generate position within safe boundaries
-            x = random.uniform(min_x, max_x)
-            y = random.uniform(min_y, max_y)
-            
-            circle = Circle(x, y, i, radius)
-            
-            # Check for overlaps
-            overlap = False
-            for existing in circles:
-                if circle.overlaps_with(existing):
-                    overlap = True
-                    break
-            
-            if not overlap:
-                circles.append(circle)
-                break
-        else:
-            # Force placement if no position found
-            circles.append(circle)
+    Args:
+        token: Token from encode_cursor()
+        fields: One function per value that checks and converts it,
+                such as cursor_time or cursor_id
     
-    return circles
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError('Invalid cursor')
+    return tuple(field(value) for field, value in zip(fields, values))
+
+
+def get_page_limit(default: int, maximum: int = 100) -> int:
+    """Read the ``limit`` query parameter, clamped to a sane range."""
+    limit = request.args.get('limit', default=default, type=int)
+    return max(1, min(limit, maximum))
+
+
+@app.before_request
+def route_reads():
+    """Send reads to the primary for players who have just written."""
+    last_write = session.get('last_write', 0)
+    db.prefer_primary(time.time() - last_write < READ_YOUR_WRITES_SECONDS)
 
 
 @app.route('/')
@@ -109,14 +203,72 @@ def index():
 
 
 @app.route('/api/leaderboard', methods=['GET'])
+@admission.limit('read')
 def get_leaderboard():
     """Get the leaderboard, optionally grouped by circle count."""
     numbers_count = request.args.get('numbers_count', type=int)
     grouped = request.args.get('grouped', default='false').lower() == 'true'
+    paginate = request.args.get('paginate', default='false').lower() == 'true'
+    window = request.args.get('window')
+    best_per_player = request.args.get('best_per_player', default='false').lower() == 'true'
+    
+    if best_per_player and (window is not None or paginate):
+        return jsonify({'error': 'best_per_player cannot be combined with window or paginate'}), 400
+    
+    if window is not None:
+        # Today / this week / all time, served from the in-memory top 10s
+        if window not in WINDOWS:
+            return jsonify({'error': f"window must be one of: {', '.join(WINDOWS)}"}), 400
+        if paginate:
+            return jsonify({'error': 'window cannot be combined with paginate'}), 400
+        
+        leaderboard_tracker.ensure_warm()
+        if grouped:
+            return jsonify(leaderboard_tracker.snapshot(window))
+        if numbers_count is None:
+            return jsonify({'error': 'window requires numbers_count or grouped=true'}), 400
+        return jsonify([
+            dict(entry, circles=numbers_count)
+            for entry in leaderboard_tracker.top(window, numbers_count)
+        ])
     
-    if grouped:
+    if paginate:
+        # Keyset-paginated leaderboard: {entries, next_cursor}
+        limit = get_page_limit(default=10)
+        after = None
+        token = request.args.get('cursor')
+        if token:
+            try:
+                after = decode_cursor(token, cursor_time, cursor_id)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Fetch one extra row to know whether another page exists
+        rows = db.get_leaderboard_page(numbers_count=numbers_count,
+                                       limit=limit + 1, after=after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        entries = [
+            {
+                'name': name,
+                'time': round(time_sec, 2),
+                'circles': num_circles,
+                'timestamp': timestamp
+            }
+            for row_id, name, time_sec, num_circles, timestamp in rows
+        ]
+        next_cursor = None
+        if has_more:
+            last_id, _, last_time, _, _ = rows[-1]
+            next_cursor = encode_cursor(last_time, last_id)
+        
+        return jsonify({'entries': entries, 'next_cursor': next_cursor})
+    elif grouped:
         # Return leaderboards grouped by circle count
-        grouped_leaderboard = db.get_leaderboard_grouped_by_circles(limit_per_group=10)
+        grouped_leaderboard = db.get_leaderboard_grouped_by_circles(
+            limit_per_group=10, best_per_player=best_per_player
+        )
         
         result = {}
         for circle_count, entries in grouped_leaderboard.items():
@@ -132,7 +284,8 @@ def get_leaderboard():
         return jsonify(result)
     else:
         # Return single leaderboard (backward compatible)
-        leaderboard = db.get_leaderboard(numbers_count=numbers_count, limit=10)
+        leaderboard = db.get_leaderboard(numbers_count=numbers_count, limit=10,
+                                         best_per_player=best_per_player)
         
         results = []
         for name, time_sec, num_circles, timestamp in leaderboard:
@@ -146,13 +299,157 @@ def get_leaderboard():
         return jsonify(results)
 
 
+@app.route('/api/leaderboard/stream', methods=['GET'])
+def stream_leaderboard():
+    """Stream live leaderboard updates as Server-Sent Events.
+    
+    The first event (``snapshot``) carries every all-time leaderboard in
+    the shape of /api/leaderboard?grouped=true. Each later ``leaderboard``
+    event is a diff: the entry that took ``rank`` on the all-time board
+    for ``numbers_count``, after which that board is cut back to ``size``
+    entries. Day and week boards are only served by /api/leaderboard.
+    """
+    leaderboard_tracker.ensure_warm()
+    
+    # Subscribe and snapshot under the tracker's lock so no diff is missed
+    # or applied twice
+    with leaderboard_tracker.lock:
+        subscription = broadcaster.subscribe()
+        snapshot = leaderboard_tracker.snapshot()
+    
+    if subscription is None:
+        response = jsonify({'error': 'Too many live connections, try again later'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    first = broadcaster.encode('snapshot', snapshot)
+    return Response(broadcaster.stream(subscription, first),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/rank', methods=['GET'])
+@admission.limit('read')
+def get_rank():
+    """Get the rank and percentile a completion time would have."""
+    numbers_count = request.args.get('numbers_count', type=int)
+    time_sec = request.args.get('time', type=float)
+    
+    if numbers_count is None or time_sec is None:
+        return jsonify({'error': 'numbers_count and time are required'}), 400
+    
+    if SHARED_RESULTS:
+        rank_service.refresh()
+    else:
+        rank_service.ensure_warm()
+    ranking = rank_service.rank(numbers_count, time_sec)
+    if ranking is None:
+        return jsonify({'rank': 1, 'total': 0, 'percentile': 100.0})
+    
+    return jsonify(ranking)
+
+
+@app.route('/api/stats', methods=['GET'])
+@admission.limit('read')
+def get_stats():
+    """Get completion-time statistics per circle count."""
+    numbers_count = request.args.get('numbers_count', type=int)
+    if SHARED_RESULTS:
+        stats_service.refresh()
+    else:
+        stats_service.ensure_warm()
+    return jsonify(stats_service.summary(numbers_count))
+
+
+@app.route('/api/replay/<int:result_id>', methods=['GET'])
+@admission.limit('read')
+def get_replay(result_id):
+    """Get the recorded clicks of a finished game."""
+    row = db.get_replay(result_id)
+    if row is None:
+        return jsonify({'error': 'Result not found'}), 404
+    
+    name, time_sec, num_circles, completed, replay = row
+    if replay is None:
+        return jsonify({'error': 'No replay recorded for this result'}), 404
+    
+    clicks = []
+    previous_ms = 0
+    for elapsed_ms, x, y in decode_replay(replay):
+        clicks.append({
+            't_ms': elapsed_ms,
+            'interval_ms': elapsed_ms - previous_ms,
+            'x': x,
+            'y': y
+        })
+        previous_ms = elapsed_ms
+    
+    return jsonify({
+        'name': name,
+        'time': round(time_sec, 2),
+        'circles': num_circles,
+        'completed': bool(completed),
+        'bytes': len(replay),
+        'clicks': clicks
+    })
+
+
+@app.route('/api/results', methods=['GET'])
+@admission.limit('read')
+def get_recent_results():
+    """Get recent game results, newest first, with keyset pagination."""
+    limit = get_page_limit(default=20)
+    before = None
+    token = request.args.get('cursor')
+    if token:
+        try:
+            before = decode_cursor(token, cursor_timestamp, cursor_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # Fetch one extra row to know whether another page exists
+    rows = db.get_results_page(limit=limit + 1, before=before)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    entries = [
+        {
+            'name': name,
+            'time': round(time_sec, 2),
+            'circles': num_circles,
+            'completed': bool(completed),
+            'timestamp': timestamp
+        }
+        for row_id, name, time_sec, num_circles, completed, timestamp in rows
+    ]
+    next_cursor = None
+    if has_more:
+        last_id = rows[-1][0]
+        last_timestamp = rows[-1][5]
+        next_cursor = encode_cursor(str(last_timestamp), last_id)
+    
+    return jsonify({'entries': entries, 'next_cursor': next_cursor})
+
+
+@app.route('/api/metrics/admission', methods=['GET'])
+def get_admission_metrics():
+    """Get admission control metrics (shed requests, queue times)."""
+    return jsonify(admission.metrics())
+
+
 @app.route('/api/game/start', methods=['POST'])
+@admission.limit('start')
 def start_game():
     """Start a new game session."""
     data = request.json
     player_name = data.get('player_name', 'Player')
     numbers_count = data.get('numbers_count', 10)
     
+    if (not isinstance(numbers_count, int) or isinstance(numbers_count, bool)
+            or not 1 <= numbers_count <= MAX_CIRCLES):
+        return jsonify({'error': f'numbers_count must be an integer from 1 to {MAX_CIRCLES}'}), 400
+    
     # Get viewport dimensions from client
     canvas_width = data.get('canvas_width', 1200)
     canvas_height = data.get('canvas_height', 700)
@@ -164,15 +461,11 @@ def start_game():
     circles = generate_circles(numbers_count, canvas_width, canvas_height, safe_area=safe_area)
     
     # Create game session
-    game_id = secrets.token_hex(8)
-    active_games[game_id] = {
-        'player_name': player_name,
-        'numbers_count': numbers_count,
-        'circles': circles,
-        'current_number': 1,
-        'start_time': time.time(),
-        'completed': False
-    }
+    game_id = make_game_id(SHARD_ID)
+    game = GameSession(circles, player_name=player_name)
+    game.replay = ReplayLog()
+    game.clicks = ClickSequence()
+    active_games[game_id] = game
     
     return jsonify({
         'game_id': game_id,
@@ -181,88 +474,135 @@ def start_game():
     })
 
 
-@app.route('/api/game/click', methods=['POST'])
-def handle_click():
-    """Handle a circle click."""
-    data = request.json
-    game_id = data.get('game_id')
-    click_x = data.get('x')
-    click_y = data.get('y')
-    
-    if game_id not in active_games:
-        return jsonify({'error': 'Game not found'}), 404
-    
-    game = active_games[game_id]
-    
-    if game['completed']:
-        return jsonify({'error': 'Game already completed'}), 400
-    
-    # Find clicked circle
-    clicked_circle = None
-    for circle in game['circles']:
-        if not circle.clicked and circle.contains_point(click_x, click_y):
-            clicked_circle = circle
-            break
+def apply_click(game: GameSession, click_x, click_y) -> dict:
+    """Resolve a click on an active game, save finished games, and build the response."""
+    now = time.time()
+    game.replay.record(game.elapsed(now), click_x, click_y)
+    result, clicked_circle = game.click(click_x, click_y, now=now)
     
     # Empty space click - do nothing
-    if clicked_circle is None:
-        return jsonify({
+    if result == EMPTY:
+        return {
             'result': 'empty',
-            'current_number': game['current_number']
-        })
+            'current_number': game.current_number
+        }
+    
+    # Finished games update the in-memory services, which must be warm first
+    if result in (COMPLETE, WRONG):
+        rank_service.ensure_warm()
+        stats_service.ensure_warm()
+        leaderboard_tracker.ensure_warm()
     
-    # Check if correct number
-    if clicked_circle.number == game['current_number']:
-        # Correct click
-        clicked_circle.clicked = True
-        game['current_number'] += 1
+    if result == COMPLETE:
+        elapsed = game.elapsed()
         
-        # Check if game complete
-        if game['current_number'] > game['numbers_count']:
-            elapsed = time.time() - game['start_time']
-            game['completed'] = True
-            
-            # Save to database
-            db.save_result(
-                game['player_name'],
-                elapsed,
-                game['numbers_count'],
-                True
-            )
-            
-            return jsonify({
-                'result': 'complete',
-                'time': round(elapsed, 2),
-                'circles': [c.to_dict() for c in game['circles']]
-            })
+        # Save to database
+        result_id = db.save_result(
+            game.player_name,
+            elapsed,
+            game.numbers_count,
+            True,
+            replay=game.replay.to_bytes()
+        )
+        session['last_write'] = time.time()
+        if SHARED_RESULTS:
+            rank_service.refresh()
+            stats_service.refresh()
+            leaderboard_tracker.refresh()
+        else:
+            rank_service.add(result_id, game.numbers_count, elapsed)
+            stats_service.add(result_id, game.numbers_count, elapsed, True)
+            leaderboard_tracker.add(result_id, game.player_name, game.numbers_count, elapsed)
         
-        return jsonify({
-            'result': 'correct',
-            'current_number': game['current_number'],
-            'circles': [c.to_dict() for c in game['circles']]
-        })
-    else:
+        return {
+            'result': 'complete',
+            'result_id': result_id,
+            'time': round(elapsed, 2),
+            'ranking': rank_service.rank(game.numbers_count, elapsed)
+        }
+    
+    if result == WRONG:
         # Wrong click - game over
-        elapsed = time.time() - game['start_time']
-        game['completed'] = True
+        elapsed = game.elapsed()
         
         # Save to database as incomplete
-        db.save_result(
-            game['player_name'],
+        result_id = db.save_result(
+            game.player_name,
             elapsed,
-            game['numbers_count'],
-            False
+            game.numbers_count,
+            False,
+            replay=game.replay.to_bytes()
         )
+        session['last_write'] = time.time()
+        if SHARED_RESULTS:
+            stats_service.refresh()
+        else:
+            stats_service.add(result_id, game.numbers_count, elapsed, False)
         
-        return jsonify({
+        return {
             'result': 'wrong',
-            'expected': game['current_number'],
+            'result_id': result_id,
+            'expected': game.current_number,
             'clicked': clicked_circle.number,
             'time': round(elapsed, 2)
-        })
+        }
+    
+    # Correct click; the client already has the board, so only the next
+    # number is sent back
+    return {
+        'result': 'correct',
+        'current_number': game.current_number
+    }
+
+
+@app.route('/api/game/click', methods=['POST'])
+@admission.limit('click')
+def handle_click():
+    """Handle a circle click.
+    
+    Clicks may carry a sequence number (``seq``, starting at 1) so the
+    client can send them without waiting for each response. Each number is
+    applied once, in order: a repeat gets its original response again and
+    a click that arrives before its predecessor gets a 409.
+    """
+    data = request.json
+    game_id = data.get('game_id')
+    click_x = data.get('x')
+    click_y = data.get('y')
+    seq = data.get('seq')
+    
+    if game_id not in active_games:
+        return jsonify({'error': 'Game not found'}), 404
+    
+    game = active_games[game_id]
+    
+    if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool) or seq < 1):
+        return jsonify({'error': 'seq must be a positive integer'}), 400
+    
+    with game.clicks.lock:
+        if seq is not None:
+            status = game.clicks.check(seq)
+            if status == DUPLICATE:
+                response = game.clicks.response_for(seq)
+                return jsonify(response or {'result': 'duplicate', 'seq': seq})
+            if status == OUT_OF_ORDER:
+                return jsonify({
+                    'error': 'Click arrived out of order',
+                    'expected_seq': game.clicks.last_seq + 1
+                }), 409
+        
+        if game.completed:
+            return jsonify({'error': 'Game already completed'}), 400
+        
+        response = apply_click(game, click_x, click_y)
+        if seq is not None:
+            response['seq'] = seq
+            game.clicks.record(seq, response)
+    
+    return jsonify(response)
 
 
 if __name__ == '__main__':
-    import os
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
-    app.run(debug=debug_mode, host='0.0.0.0', port=5000)
+    port = int(os.environ.get('PORT', 5000))
+    app.run(debug=debug_mode, host='0.0.0.0', port=port)
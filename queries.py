@@ -0,0 +1,308 @@
+"""
+SQL statements shared by the PostgreSQL and SQLite backends.
+
+Each query is written once with ``?`` placeholders and ``{true}`` and
+``{false}`` for booleans, then rendered for the active dialect when the database is set
+up. On PostgreSQL a rendered statement is prepared once per connection and
+run with EXECUTE, so the server skips parsing and planning on every call.
+"""
+
+import re
+from typing import Dict, Sequence
+
+
+class Query:
+    """A SQL statement in dialect-neutral form."""
+    
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+    
+    def render(self, postgres: bool) -> 'Statement':
+        """Render this query for PostgreSQL or SQLite."""
+        text = self.sql.format(true="TRUE" if postgres else "1",
+                               false="FALSE" if postgres else "0")
+        return Statement(self.name, text, postgres)
+
+
+class Statement:
+    """A query rendered for one dialect."""
+    
+    def __init__(self, name: str, text: str, postgres: bool):
+        self.name = name
+        self.param_count = text.count("?")
+        self.postgres = postgres
+        
+        if postgres:
+            # Plain text for psycopg2, plus PREPARE/EXECUTE forms using $n
+            self.sql = text.replace("?", "%s")
+            numbers = iter(range(1, self.param_count + 1))
+            self.prepare_sql = f"PREPARE {name} AS " + re.sub(
+                r"\?", lambda match: f"${next(numbers)}", text
+            )
+            args = ", ".join(["%s"] * self.param_count)
+            self.execute_sql = f"EXECUTE {name} ({args})" if args else f"EXECUTE {name}"
+        else:
+            self.sql = text
+            self.prepare_sql = None
+            self.execute_sql = text
+
+
+QUERIES = [
+    Query("insert_result", """
+        INSERT INTO results (player_name, time_seconds, numbers_count, completed, timestamp, replay)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """),
+    Query("insert_result_returning", """
+        INSERT INTO results (player_name, time_seconds, numbers_count, completed, timestamp, replay)
+        VALUES (?, ?, ?, ?, ?, ?)
+        RETURNING id
+    """),
+    Query("get_replay", """
+        SELECT player_name, time_seconds, numbers_count, completed, replay
+        FROM results
+        WHERE id = ?
+    """),
+    Query("leaderboard", """
+        SELECT player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true}
+        ORDER BY time_seconds ASC
+        LIMIT ?
+    """),
+    Query("leaderboard_by_count", """
+        SELECT player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND numbers_count = ?
+        ORDER BY time_seconds ASC
+        LIMIT ?
+    """),
+    Query("completed_counts", """
+        SELECT DISTINCT numbers_count
+        FROM results
+        WHERE completed = {true}
+        ORDER BY numbers_count ASC
+    """),
+    Query("player_bests", """
+        SELECT player_name, best_time, numbers_count, timestamp
+        FROM player_bests
+        ORDER BY best_time ASC, player_name ASC
+        LIMIT ?
+    """),
+    Query("player_bests_by_count", """
+        SELECT player_name, best_time, numbers_count, timestamp
+        FROM player_bests
+        WHERE numbers_count = ?
+        ORDER BY best_time ASC, player_name ASC
+        LIMIT ?
+    """),
+    Query("player_best_counts", """
+        SELECT DISTINCT numbers_count
+        FROM player_bests
+        ORDER BY numbers_count ASC
+    """),
+    Query("upsert_player_best", """
+        INSERT INTO player_bests (numbers_count, player_name, best_time, result_id, timestamp)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (numbers_count, player_name) DO UPDATE SET
+            best_time = EXCLUDED.best_time,
+            result_id = EXCLUDED.result_id,
+            timestamp = EXCLUDED.timestamp
+        WHERE EXCLUDED.best_time < player_bests.best_time
+    """),
+    Query("backfill_player_bests", """
+        INSERT INTO player_bests (numbers_count, player_name, best_time, result_id, timestamp)
+        SELECT numbers_count, player_name, time_seconds, id, timestamp
+        FROM (
+            SELECT numbers_count, player_name, time_seconds, id, timestamp,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY numbers_count, player_name
+                       ORDER BY time_seconds ASC, id ASC
+                   ) AS position
+            FROM results
+            WHERE completed = {true}
+        ) ranked
+        WHERE position = 1
+        ON CONFLICT (numbers_count, player_name) DO NOTHING
+    """),
+    Query("recent_results", """
+        SELECT player_name, time_seconds, numbers_count, completed, timestamp
+        FROM results
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """),
+    Query("leaderboard_page", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true}
+        ORDER BY time_seconds ASC, id ASC
+        LIMIT ?
+    """),
+    Query("leaderboard_page_after", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND (time_seconds, id) > (?, ?)
+        ORDER BY time_seconds ASC, id ASC
+        LIMIT ?
+    """),
+    Query("leaderboard_page_by_count", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND numbers_count = ?
+        ORDER BY time_seconds ASC, id ASC
+        LIMIT ?
+    """),
+    Query("leaderboard_page_by_count_after", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND numbers_count = ? AND (time_seconds, id) > (?, ?)
+        ORDER BY time_seconds ASC, id ASC
+        LIMIT ?
+    """),
+    Query("results_page", """
+        SELECT id, player_name, time_seconds, numbers_count, completed, timestamp
+        FROM results
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """),
+    Query("results_page_before", """
+        SELECT id, player_name, time_seconds, numbers_count, completed, timestamp
+        FROM results
+        WHERE (timestamp, id) < (?, ?)
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """),
+    Query("completed_times", """
+        SELECT id, numbers_count, time_seconds, timestamp
+        FROM results
+        WHERE completed = {true}
+    """),
+    Query("results_after", """
+        SELECT id, numbers_count, time_seconds, completed, timestamp
+        FROM results
+        WHERE id > ?
+        ORDER BY id ASC
+    """),
+    Query("max_result_id", """
+        SELECT COALESCE(MAX(id), 0)
+        FROM results
+    """),
+    Query("last_result_before", """
+        SELECT id
+        FROM results
+        WHERE timestamp <= ?
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1
+    """),
+    Query("completed_after", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND id > ?
+        ORDER BY id ASC
+        LIMIT ?
+    """),
+    Query("completed_since", """
+        SELECT id, player_name, time_seconds, numbers_count, timestamp
+        FROM results
+        WHERE completed = {true} AND timestamp >= ?
+    """),
+    Query("load_leaderboard_summaries", """
+        SELECT numbers_count, summary, last_result_id
+        FROM leaderboard_summaries
+    """),
+    Query("save_leaderboard_summary", """
+        INSERT INTO leaderboard_summaries (numbers_count, summary, last_result_id, updated_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (numbers_count) DO UPDATE SET
+            summary = EXCLUDED.summary,
+            last_result_id = EXCLUDED.last_result_id,
+            updated_at = EXCLUDED.updated_at
+    """),
+    Query("load_stats_checkpoints", """
+        SELECT numbers_count, sketch, last_result_id
+        FROM stats_sketches
+    """),
+    Query("save_stats_checkpoint", """
+        INSERT INTO stats_sketches (numbers_count, sketch, last_result_id, updated_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (numbers_count) DO UPDATE SET
+            sketch = EXCLUDED.sketch,
+            last_result_id = EXCLUDED.last_result_id,
+            updated_at = EXCLUDED.updated_at
+    """),
+    Query("expired_failures", """
+        SELECT id, timestamp, numbers_count, time_seconds
+        FROM results
+        WHERE completed = {false} AND timestamp < ?
+        ORDER BY timestamp ASC, id ASC
+        LIMIT ?
+    """),
+    Query("delete_expired_failures", """
+        DELETE FROM results
+        WHERE completed = {false} AND timestamp < ? AND (timestamp, id) <= (?, ?)
+    """),
+    Query("add_daily_failures", """
+        INSERT INTO daily_failures (day, numbers_count, games, total_time_seconds)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (day, numbers_count) DO UPDATE SET
+            games = daily_failures.games + EXCLUDED.games,
+            total_time_seconds = daily_failures.total_time_seconds + EXCLUDED.total_time_seconds
+    """),
+    # Partial indexes; create_tables() runs these as plain statements
+    Query("create_index_leaderboard", """
+        CREATE INDEX IF NOT EXISTS idx_results_leaderboard
+        ON results (numbers_count, time_seconds, id)
+        WHERE completed = {true}
+    """),
+    Query("create_index_leaderboard_all", """
+        CREATE INDEX IF NOT EXISTS idx_results_leaderboard_all
+        ON results (time_seconds, id)
+        WHERE completed = {true}
+    """),
+    Query("create_index_failed", """
+        CREATE INDEX IF NOT EXISTS idx_results_failed
+        ON results (timestamp, id)
+        WHERE completed = {false}
+    """),
+]
+
+
+def render_queries(postgres: bool) -> Dict[str, Statement]:
+    """Render every query for the given dialect, keyed by name."""
+    return {query.name: query.render(postgres) for query in QUERIES}
+
+
+def execute(conn, cursor, statement: Statement, params: Sequence = (),
+            prepare: bool = True):
+    """
+    Run a rendered statement on a connection from GameDatabase.
+    
+    On PostgreSQL the statement is prepared the first time this connection
+    runs it; SQLite connections keep their own statement cache.
+    
+    Args:
+        conn: Pooled connection that tracks which statements it has prepared
+        cursor: Cursor to run the statement on
+        statement: Statement from render_queries()
+        params: Statement parameters
+        prepare: Use a server-side prepared statement (PostgreSQL only)
+    """
+    if not (statement.postgres and prepare):
+        cursor.execute(statement.sql, params)
+        return
+    
+    if statement.name not in conn.prepared:
+        cursor.execute(statement.prepare_sql)
+        conn.prepared.add(statement.name)
+    cursor.execute(statement.execute_sql, params)
+
+
+def execute_many(conn, cursor, statement: Statement, rows: Sequence[Sequence],
+                 prepare: bool = True):
+    """Run a rendered statement once per parameter row (see execute())."""
+    if not (statement.postgres and prepare):
+        cursor.executemany(statement.sql, rows)
+        return
+    
+    for params in rows:
+        execute(conn, cursor, statement, params)
@@ -0,0 +1,117 @@
+"""
+In-memory rank lookup for completed games.
+
+Keeps one Fenwick tree (binary indexed tree) per circle count over
+quantized completion times, so a player's rank and percentile can be
+answered in O(log n) without running a COUNT query.
+"""
+
+from typing import Dict, Optional
+
+from consumer import ResultConsumer
+
+
+class FenwickTree:
+    """Binary indexed tree of counts supporting prefix sums in O(log n).
+    
+    Nodes are allocated on first use, so a tree costs memory in proportion
+    to the results added (about log2(size) nodes each), not to its size.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.tree: Dict[int, int] = {}
+    
+    def add(self, index: int, delta: int = 1):
+        """Add delta to the count at a zero-based index."""
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] = self.tree.get(i, 0) + delta
+            i += i & -i
+    
+    def prefix_sum(self, index: int) -> int:
+        """Sum of counts at zero-based indices [0, index]."""
+        total = 0
+        i = min(index, self.size - 1) + 1
+        while i > 0:
+            total += self.tree.get(i, 0)
+            i -= i & -i
+        return total
+
+
+class RankService(ResultConsumer):
+    """Maintains completion-time rankings per circle count.
+    
+    Times are quantized to ``resolution`` seconds (10ms by default, which is
+    the precision shown to players); times at or beyond ``max_seconds``
+    share the last bucket. Two results in the same bucket share a rank.
+    The trees are rebuilt from the database on startup, never checkpointed;
+    results too recent to have settled are tracked by ID (see ResultConsumer)
+    so the catch-up doesn't count them again.
+    """
+    
+    def __init__(self, db, resolution: float = 0.01, max_seconds: float = 600.0,
+                 settle_seconds: float = 0.0):
+        super().__init__(db, settle_seconds=settle_seconds)
+        self.resolution = resolution
+        self.bucket_count = int(max_seconds / resolution) + 1
+        self.trees: Dict[int, FenwickTree] = {}
+        self.totals: Dict[int, int] = {}
+    
+    def _bucket(self, time_seconds: float) -> int:
+        """Map a completion time to its bucket index."""
+        bucket = int(round(time_seconds / self.resolution))
+        return max(0, min(bucket, self.bucket_count - 1))
+    
+    def _restore(self) -> bool:
+        """Load every completed result in one pass."""
+        settled_id = self._last_settled_id()
+        for result_id, numbers_count, time_seconds, _ in self.db.iter_completed_times():
+            self._apply(result_id, numbers_count, time_seconds)
+            if settled_id is None or result_id <= settled_id:
+                self.last_result_id = max(self.last_result_id, result_id)
+            else:
+                self.applied.add(result_id)
+        return True
+    
+    def _results_after(self, last_id: int):
+        for result_id, numbers_count, time_seconds, completed, timestamp in \
+                self.db.iter_results_after(last_id):
+            if completed:
+                yield result_id, timestamp, (numbers_count, time_seconds)
+    
+    def _apply(self, result_id: int, numbers_count: int, time_seconds: float,
+               notify: bool = True):
+        tree = self.trees.get(numbers_count)
+        if tree is None:
+            tree = self.trees[numbers_count] = FenwickTree(self.bucket_count)
+            self.totals[numbers_count] = 0
+        tree.add(self._bucket(time_seconds))
+        self.totals[numbers_count] += 1
+    
+    def rank(self, numbers_count: int, time_seconds: float) -> Optional[dict]:
+        """
+        Get the rank of a completion time among recorded results.
+        
+        Args:
+            numbers_count: Number of circles in the game
+            time_seconds: Completion time to rank
+            
+        Returns:
+            Dictionary with rank (1 = fastest), total and percentile (share of
+            results this time is at least as fast as), or None if no results
+            have been recorded for this circle count
+        """
+        with self.lock:
+            tree = self.trees.get(numbers_count)
+            if tree is None:
+                return None
+            bucket = self._bucket(time_seconds)
+            faster = tree.prefix_sum(bucket - 1) if bucket > 0 else 0
+            total = self.totals[numbers_count]
+        
+        return {
+            'rank': faster + 1,
+            'total': total,
+            'percentile': round(100.0 * (total - faster) / total, 2)
+        }
@@ -0,0 +1,96 @@
+"""
+Compact binary click logs for replaying and auditing games.
+
+A replay is a version byte followed by one record per click:
+
+    varint  milliseconds since the previous click (or the game start)
+    int16   x coordinate (little-endian)
+    int16   y coordinate (little-endian)
+
+Human click intervals need two varint bytes, so a click costs about six
+bytes and a 20-circle game about 120.
+"""
+
+import struct
+from typing import List, Tuple
+
+REPLAY_VERSION = 1
+
+_COORDS = struct.Struct('<hh')
+_INT16_MIN, _INT16_MAX = -32768, 32767
+
+
+def _clamp_int16(value: float) -> int:
+    return max(_INT16_MIN, min(_INT16_MAX, int(round(value))))
+
+
+class ReplayLog:
+    """Incrementally built binary log of a game's clicks."""
+    
+    def __init__(self):
+        self.buffer = bytearray([REPLAY_VERSION])
+        self.last_ms = 0
+        self.clicks = 0
+    
+    def record(self, elapsed_seconds: float, x: float, y: float):
+        """Append a click made elapsed_seconds after the game started."""
+        elapsed_ms = max(self.last_ms, int(round(elapsed_seconds * 1000)))
+        delta = elapsed_ms - self.last_ms
+        self.last_ms = elapsed_ms
+        
+        # Unsigned LEB128 varint
+        while delta >= 0x80:
+            self.buffer.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        self.buffer.append(delta)
+        
+        self.buffer += _COORDS.pack(_clamp_int16(x), _clamp_int16(y))
+        self.clicks += 1
+    
+    def to_bytes(self) -> bytes:
+        """Get the encoded log."""
+        return bytes(self.buffer)
+
+
+def decode_replay(data: bytes) -> List[Tuple[int, int, int]]:
+    """
+    Decode a replay log.
+    
+    Args:
+        data: Bytes produced by ReplayLog.to_bytes()
+        
+    Returns:
+        List of tuples (milliseconds since game start, x, y), one per click
+        
+    Raises:
+        ValueError: If the data is truncated or has an unknown version
+    """
+    data = bytes(data)
+    if not data or data[0] != REPLAY_VERSION:
+        raise ValueError("Unsupported replay version")
+    
+    clicks = []
+    elapsed_ms = 0
+    pos = 1
+    while pos < len(data):
+        delta = 0
+        shift = 0
+        while True:
+            if pos >= len(data):
+                raise ValueError("Truncated replay")
+            byte = data[pos]
+            pos += 1
+            delta |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        
+        if pos + _COORDS.size > len(data):
+            raise ValueError("Truncated replay")
+        x, y = _COORDS.unpack_from(data, pos)
+        pos += _COORDS.size
+        
+        elapsed_ms += delta
+        clicks.append((elapsed_ms, x, y))
+    
+    return clicks
@@ -0,0 +1,72 @@
+"""
+Retention for the results table.
+
+Only completed games appear on leaderboards, so failed and abandoned games
+older than the retention window are rolled up into the per-day
+``daily_failures`` table and removed from ``results``. Raw rows are deleted
+in bounded batches; on a partitioned PostgreSQL table (RESULTS_PARTITIONED)
+whole monthly partitions of failed games are rolled up and dropped instead.
+
+Run periodically, e.g. from cron:
+
+    python retention.py --days 30
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from database import GameDatabase
+
+
+def run_retention(db: GameDatabase, days: int = 30, batch_size: int = 500,
+                  pause_seconds: float = 0.0, max_batches: int = None) -> dict:
+    """
+    Roll up and remove failed games older than the retention window.
+    
+    Args:
+        db: Database to clean up
+        days: Keep failed games from the last this many days
+        batch_size: Maximum rows removed per transaction
+        pause_seconds: Sleep between batches to limit load on the database
+        max_batches: Stop after this many batches (None for no limit)
+        
+    Returns:
+        Dictionary with the number of rows removed and partitions dropped
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    
+    # Keep this month's and the next two months' partitions ready so new
+    # failed games never land in the default partition, then drop whole
+    # months past the cutoff
+    db.ensure_failed_partitions(date.today(), months=3)
+    dropped = db.drop_failed_partitions_before(cutoff)
+    
+    removed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = db.roll_up_failed_batch(cutoff, batch_size)
+        if count == 0:
+            break
+        removed += count
+        batches += 1
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    
+    return {'rows_removed': removed, 'partitions_dropped': dropped}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Roll up and remove old failed games.")
+    parser.add_argument('--days', type=int, default=30,
+                        help="keep failed games from the last N days (default: 30)")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="rows removed per transaction (default: 500)")
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help="seconds to sleep between batches (default: 0)")
+    args = parser.parse_args()
+    
+    summary = run_retention(GameDatabase(), days=args.days,
+                            batch_size=args.batch_size, pause_seconds=args.pause)
+    print(f"Removed {summary['rows_removed']} failed games, "
+          f"dropped {len(summary['partitions_dropped'])} partitions")
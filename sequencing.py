@@ -0,0 +1,56 @@
+"""
+Ordered, idempotent delivery of a game's clicks.
+
+The web client resolves clicks locally and sends them without waiting for
+each response, numbering them 1, 2, 3, ... Requests can still arrive out of
+order or be retried, so the server applies each sequence number exactly
+once and in order: a repeat gets the response it was first given, and a
+click that arrives before its predecessor is rejected so the client can
+resend it.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Responses remembered per game for answering retried clicks
+RESPONSE_HISTORY = 32
+
+PROCESS = "process"
+DUPLICATE = "duplicate"
+OUT_OF_ORDER = "out_of_order"
+
+
+class ClickSequence:
+    """Sequence-number state for one game."""
+    
+    def __init__(self, history: int = RESPONSE_HISTORY):
+        self.lock = threading.Lock()  # Held while a click is checked, applied and recorded
+        self.last_seq = 0
+        self.history = history
+        self.responses = OrderedDict()
+    
+    def check(self, seq: int) -> str:
+        """
+        Classify a sequence number. Call with the lock held.
+        
+        Returns:
+            PROCESS if seq is the next click, DUPLICATE if it was already
+            applied, or OUT_OF_ORDER if an earlier click hasn't arrived yet
+        """
+        if seq <= self.last_seq:
+            return DUPLICATE
+        if seq != self.last_seq + 1:
+            return OUT_OF_ORDER
+        return PROCESS
+    
+    def record(self, seq: int, response: dict):
+        """Mark seq as applied and remember its response. Call with the lock held."""
+        self.last_seq = seq
+        self.responses[seq] = response
+        while len(self.responses) > self.history:
+            self.responses.popitem(last=False)
+    
+    def response_for(self, seq: int) -> Optional[dict]:
+        """The response given to an applied click, if still remembered."""
+        return self.responses.get(seq)
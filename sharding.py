@@ -0,0 +1,30 @@
+"""
+Shard-aware game IDs.
+
+A game ID starts with two hex digits naming the worker shard that owns the
+game's in-memory state, followed by 16 random hex digits. The front
+dispatcher (supervisor.py) reads the prefix to route clicks to the owner
+without any shared session store.
+"""
+
+import secrets
+from typing import Optional
+
+MAX_SHARDS = 256
+
+
+def make_game_id(shard: int) -> str:
+    """Create a new game ID owned by a shard."""
+    if not 0 <= shard < MAX_SHARDS:
+        raise ValueError(f"Shard must be between 0 and {MAX_SHARDS - 1}")
+    return f"{shard:02x}{secrets.token_hex(8)}"
+
+
+def shard_of(game_id) -> Optional[int]:
+    """Get the shard that owns a game ID, or None if it isn't a valid ID."""
+    if not isinstance(game_id, str) or len(game_id) != 18:
+        return None
+    try:
+        return int(game_id[:2], 16)
+    except ValueError:
+        return None
@@ -0,0 +1,193 @@
+"""
+Headless bot simulation for the number sequence speed test.
+
+Plays large numbers of bot games against the shared engine across a
+process pool, to stress board generation, rule evaluation and (optionally)
+the persistence path without any UI.
+
+    python simulate.py --games 1000000 --circles 10 --accuracy 0.98
+    python simulate.py --games 10000 --persist --db simulation.db
+"""
+
+import argparse
+import math
+import random
+import time
+from multiprocessing import Pool, cpu_count
+from typing import List, Optional, Tuple
+
+from engine import GameSession, generate_circles
+
+
+class BotModel:
+    """How a simulated player aims and how long each click takes.
+    
+    Accuracy is the probability that a click targets the correct circle
+    (otherwise it hits another unclicked circle, ending the game), and
+    miss_rate is the probability of a harmless click on empty space.
+    Click time follows Fitts's law: reaction + fitts_b * log2(1 + D / W)
+    seconds plus Gaussian jitter.
+    """
+    
+    def __init__(self, accuracy: float = 0.98, miss_rate: float = 0.02,
+                 reaction: float = 0.25, fitts_b: float = 0.1, jitter: float = 0.05):
+        self.accuracy = accuracy
+        self.miss_rate = miss_rate
+        self.reaction = reaction
+        self.fitts_b = fitts_b
+        self.jitter = jitter
+    
+    def click_time(self, distance: float, width: float, rng: random.Random) -> float:
+        """Seconds taken to move and click a target at a distance."""
+        duration = self.reaction + self.fitts_b * math.log2(1 + distance / width)
+        return max(0.05, duration + rng.gauss(0, self.jitter))
+
+
+def play_bot_game(model: BotModel, numbers_count: int, width: int, height: int,
+                  rng: random.Random) -> Tuple[bool, float, int]:
+    """
+    Play one bot game on a simulated clock.
+    
+    Returns:
+        Tuple (completed, time_seconds, clicks)
+    """
+    circles = generate_circles(numbers_count, width, height, rng=rng)
+    session = GameSession(circles, player_name="bot", start_time=0.0, clock=lambda: 0.0)
+    
+    now = 0.0
+    pointer = (width / 2, height / 2)
+    clicks = 0
+    while not session.completed:
+        if rng.random() < model.miss_rate:
+            # Stray click; the corner is outside every circle's safe area
+            target_x, target_y = 0.0, 0.0
+        else:
+            target = circles[session.current_number - 1]
+            if rng.random() >= model.accuracy:
+                others = [c for c in circles if not c.clicked and c is not target]
+                if others:
+                    target = rng.choice(others)
+            target_x, target_y = target.x, target.y
+        
+        distance = math.hypot(target_x - pointer[0], target_y - pointer[1])
+        now += model.click_time(distance, 2 * circles[0].radius, rng)
+        pointer = (target_x, target_y)
+        clicks += 1
+        
+        session.click(target_x, target_y, now=now)
+    
+    return session.won, session.elapsed(), clicks
+
+
+def simulate_batch(args) -> Tuple[int, int, float, int, Optional[List[Tuple[float, bool]]]]:
+    """
+    Pool worker: play a batch of games.
+    
+    Returns:
+        Tuple (games, completed, total_completed_time, clicks, results) where
+        results lists (time_seconds, completed) per game if requested
+    """
+    games, seed, model, numbers_count, width, height, keep_results = args
+    rng = random.Random(seed)
+    completed = 0
+    total_time = 0.0
+    total_clicks = 0
+    results = [] if keep_results else None
+    
+    for _ in range(games):
+        won, elapsed, clicks = play_bot_game(model, numbers_count, width, height, rng)
+        total_clicks += clicks
+        if won:
+            completed += 1
+            total_time += elapsed
+        if keep_results:
+            results.append((elapsed, won))
+    
+    return games, completed, total_time, total_clicks, results
+
+
+def run_simulation(games: int, model: BotModel, numbers_count: int = 10,
+                   width: int = 1200, height: int = 700, processes: int = None,
+                   batch_size: int = 1000, seed: int = 0, db=None) -> dict:
+    """
+    Play bot games across a process pool.
+    
+    Args:
+        games: Total number of games to play
+        model: Bot accuracy and speed model
+        numbers_count: Number of circles per game
+        width, height: Board size
+        processes: Worker processes (defaults to the CPU count)
+        batch_size: Games per task sent to a worker
+        seed: Base random seed; each batch derives its own
+        db: Optional GameDatabase to save every result to
+        
+    Returns:
+        Summary dictionary with totals and throughput
+    """
+    processes = processes or cpu_count()
+    tasks = []
+    remaining = games
+    batch = 0
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        tasks.append((size, seed * 1_000_003 + batch, model, numbers_count,
+                      width, height, db is not None))
+        remaining -= size
+        batch += 1
+    
+    played = completed = clicks = saved = 0
+    total_time = 0.0
+    started = time.perf_counter()
+    
+    with Pool(processes) as pool:
+        for b_games, b_completed, b_time, b_clicks, results in pool.imap_unordered(simulate_batch, tasks):
+            played += b_games
+            completed += b_completed
+            total_time += b_time
+            clicks += b_clicks
+            if db is not None:
+                for elapsed, won in results:
+                    db.save_result("bot", elapsed, numbers_count, won)
+                    saved += 1
+    
+    duration = time.perf_counter() - started
+    return {
+        'games': played,
+        'completed': completed,
+        'failure_rate': round(1 - completed / played, 4) if played else None,
+        'mean_time': round(total_time / completed, 3) if completed else None,
+        'clicks': clicks,
+        'saved': saved,
+        'seconds': round(duration, 2),
+        'games_per_minute': round(played / duration * 60) if duration else None
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a headless bot simulation.")
+    parser.add_argument('--games', type=int, default=100000, help="games to play (default: 100000)")
+    parser.add_argument('--circles', type=int, default=10, help="circles per game (default: 10)")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="games per worker task (default: 1000)")
+    parser.add_argument('--accuracy', type=float, default=0.98, help="chance each click targets the right circle")
+    parser.add_argument('--miss-rate', type=float, default=0.02, help="chance of a click on empty space")
+    parser.add_argument('--reaction', type=float, default=0.25, help="base seconds per click")
+    parser.add_argument('--fitts-b', type=float, default=0.1, help="Fitts's law slope in seconds per bit")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--persist', action='store_true', help="save every result to the database")
+    parser.add_argument('--db', default="simulation.db", help="SQLite file used with --persist (default: simulation.db)")
+    args = parser.parse_args()
+    
+    model = BotModel(accuracy=args.accuracy, miss_rate=args.miss_rate,
+                     reaction=args.reaction, fitts_b=args.fitts_b)
+    db = None
+    if args.persist:
+        from database import GameDatabase
+        db = GameDatabase(args.db)
+    
+    summary = run_simulation(args.games, model, numbers_count=args.circles,
+                             processes=args.processes, batch_size=args.batch_size,
+                             seed=args.seed, db=db)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
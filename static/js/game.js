@@ -6,13 +6,24 @@ let gameState = {
     timerInterval: null,
     currentNumber: 1,
     playerName: '',
-    numbersCount: 10
+    numbersCount: 10,
+    nextSeq: 1,                  // Sequence number of the next click sent
+    lastSend: Promise.resolve(), // Settles once every click sent so far is reconciled
+    inputLocked: false,          // Set while a predicted game end awaits confirmation
+    over: false                  // Set once the server has ended the game
 };
 
+// Board renderer for the game canvas (see board.js)
+let board = null;
+
+// Grouped leaderboard kept current by the live stream (null when not connected)
+let leaderboardData = null;
+
 // Initialize the application
 document.addEventListener('DOMContentLoaded', () => {
     loadLeaderboard('leaderboard-start');
     setupEventListeners();
+    connectLeaderboardStream();
 });
 
 // Setup event listeners
@@ -25,6 +36,7 @@ function setupEventListeners() {
     // Setup canvas
     const canvas = document.getElementById('game-canvas');
     canvas.addEventListener('click', handleCanvasClick);
+    board = new BoardRenderer(canvas);
     
     // Resize canvas to fill available space
     window.addEventListener('resize', resizeCanvas);
@@ -40,9 +52,9 @@ function resizeCanvas() {
     canvas.width = window.innerWidth;
     canvas.height = window.innerHeight;
     
-    // Redraw circles if game is active
+    // Redraw circles if game is active (resizing clears the canvas)
     if (gameState.gameId && gameState.circles.length > 0) {
-        drawCircles();
+        board.render();
     }
 }
 
@@ -69,6 +81,26 @@ function getSafePlayArea() {
     };
 }
 
+// POST JSON, retrying when the server sheds load (503 + Retry-After)
+async function postJSON(url, body, maxRetries = 3) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(body)
+        });
+        
+        if (response.status !== 503 || attempt >= maxRetries) {
+            return response;
+        }
+        
+        const retryAfter = parseFloat(response.headers.get('Retry-After')) || 1;
+        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+    }
+}
+
 // Start a new game
 async function startGame() {
     const playerName = document.getElementById('player-name').value.trim() || 'Player';
@@ -89,18 +121,12 @@ async function startGame() {
     const safeArea = getSafePlayArea();
     
     try {
-        const response = await fetch('/api/game/start', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                player_name: playerName,
-                numbers_count: numbersCount,
-                canvas_width: canvas.width,
-                canvas_height: canvas.height,
-                safe_area: safeArea
-            })
+        const response = await postJSON('/api/game/start', {
+            player_name: playerName,
+            numbers_count: numbersCount,
+            canvas_width: canvas.width,
+            canvas_height: canvas.height,
+            safe_area: safeArea
         });
         
         const data = await response.json();
@@ -109,13 +135,17 @@ async function startGame() {
         gameState.circles = data.circles;
         gameState.currentNumber = 1;
         gameState.startTime = Date.now();
+        gameState.nextSeq = 1;
+        gameState.lastSend = Promise.resolve();
+        gameState.inputLocked = false;
+        gameState.over = false;
         
         // Update UI
         document.getElementById('player-display').textContent = playerName;
         document.getElementById('next-number').textContent = '1';
         
-        // Draw circles
-        drawCircles();
+        // Draw the board once; clicks then repaint only what changed
+        board.setCircles(gameState.circles);
         
         // Start timer
         startTimer();
@@ -126,98 +156,126 @@ async function startGame() {
     }
 }
 
-// Draw circles on canvas
-function drawCircles() {
-    const canvas = document.getElementById('game-canvas');
-    const ctx = canvas.getContext('2d');
-    
-    // Clear canvas
-    ctx.clearRect(0, 0, canvas.width, canvas.height);
-    
-    // Draw each circle
-    gameState.circles.forEach(circle => {
-        // Circle color based on state - minimal styling
-        const fillColor = circle.clicked ? '#3f3f46' : '#27272a'; // Dark gray tones
-        const strokeColor = circle.clicked ? '#eab308' : '#52525b'; // Mustard yellow when clicked, steel gray otherwise
-        
-        // Draw circle
-        ctx.beginPath();
-        ctx.arc(circle.x, circle.y, circle.radius, 0, 2 * Math.PI);
-        ctx.fillStyle = fillColor;
-        ctx.fill();
-        ctx.strokeStyle = strokeColor;
-        ctx.lineWidth = 2; // Thinner border
-        ctx.stroke();
-        
-        // Draw number
-        ctx.fillStyle = circle.clicked ? '#eab308' : '#fafaf9'; // Mustard yellow when clicked, off-white otherwise
-        ctx.font = 'bold 24px Arial';
-        ctx.textAlign = 'center';
-        ctx.textBaseline = 'middle';
-        ctx.fillText(circle.number, circle.x, circle.y);
-    });
+// Mark circles clicked up to and including lastNumber
+function markClickedThrough(lastNumber) {
+    for (let number = gameState.currentNumber; number <= lastNumber; number++) {
+        board.markClicked(number);
+    }
+}
+
+// Find the unclicked circle at a point, as the server does
+function findCircleAt(x, y) {
+    return gameState.circles.find(circle =>
+        !circle.clicked && (x - circle.x) ** 2 + (y - circle.y) ** 2 <= circle.radius ** 2
+    );
 }
 
 // Handle canvas click
-async function handleCanvasClick(event) {
-    if (!gameState.gameId) return;
+function handleCanvasClick(event) {
+    if (!gameState.gameId || gameState.inputLocked) return;
     
     const canvas = document.getElementById('game-canvas');
     const rect = canvas.getBoundingClientRect();
     const x = event.clientX - rect.left;
     const y = event.clientY - rect.top;
     
-    try {
-        const response = await fetch('/api/game/click', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                game_id: gameState.gameId,
-                x: x,
-                y: y
-            })
-        });
-        
+    // Resolve the click locally so the board updates without waiting a round trip
+    const circle = findCircleAt(x, y);
+    let predicted = 'empty';
+    if (circle) {
+        if (circle.number !== gameState.currentNumber) {
+            predicted = 'wrong';
+        } else if (circle.number === gameState.numbersCount) {
+            predicted = 'complete';
+        } else {
+            predicted = 'correct';
+        }
+    }
+    
+    if (predicted === 'correct' || predicted === 'complete') {
+        board.markClicked(circle.number);
+        gameState.currentNumber = circle.number + 1;
+    }
+    if (predicted === 'correct') {
+        document.getElementById('next-number').textContent = gameState.currentNumber;
+    } else if (predicted !== 'empty') {
+        // Hold further clicks until the server confirms the game is over
+        gameState.inputLocked = true;
+        stopTimer();
+    }
+    
+    sendClick(gameState.gameId, gameState.nextSeq++, x, y, predicted, gameState.currentNumber);
+}
+
+// Send a click without waiting for earlier ones; responses are reconciled in order
+function sendClick(gameId, seq, x, y, predicted, expectedNumber) {
+    const previous = gameState.lastSend;
+    const body = { game_id: gameId, seq: seq, x: x, y: y };
+    
+    const send = (async () => {
+        let response = await postJSON('/api/game/click', body);
+        if (response.status === 409) {
+            // Overtook an earlier click; resend once that one has been applied
+            await previous;
+            response = await postJSON('/api/game/click', body);
+        }
         const data = await response.json();
         
-        if (data.result === 'empty') {
-            // Empty space click - do nothing
-            return;
-        } else if (data.result === 'correct') {
-            // Update circles
-            gameState.circles = data.circles;
-            gameState.currentNumber = data.current_number;
-            
-            // Update UI
-            document.getElementById('next-number').textContent = data.current_number;
-            
-            // Redraw
-            drawCircles();
-            
-        } else if (data.result === 'complete') {
-            // Game complete
-            stopTimer();
-            gameState.circles = data.circles;
-            drawCircles();
-            
-            setTimeout(() => {
-                showResult(true, data.time, null, null);
-            }, 500);
-            
-        } else if (data.result === 'wrong') {
-            // Wrong click - game over
-            stopTimer();
-            
-            setTimeout(() => {
-                showResult(false, data.time, data.expected, data.clicked);
-            }, 300);
+        await previous;
+        if (gameState.gameId !== gameId || gameState.over) return;
+        if (!response.ok) {
+            throw new Error(data.error || `HTTP ${response.status}`);
         }
-        
-    } catch (error) {
+        reconcileClick(data, predicted, expectedNumber);
+    })();
+    
+    gameState.lastSend = send.catch(() => {});
+    send.catch(error => {
         console.error('Error handling click:', error);
         alert('An error occurred. Please refresh the page and try again.\n\nError: ' + error.message);
+    });
+}
+
+// Apply the server's verdict on a click, rolling back if it disagrees
+function reconcileClick(data, predicted, expectedNumber) {
+    if (data.result === 'complete') {
+        // Game complete
+        gameState.over = true;
+        stopTimer();
+        markClickedThrough(gameState.numbersCount);
+        
+        setTimeout(() => {
+            showResult(true, data.time, null, null, data.ranking);
+        }, 500);
+        
+    } else if (data.result === 'wrong') {
+        // Wrong click - game over
+        gameState.over = true;
+        stopTimer();
+        
+        setTimeout(() => {
+            showResult(false, data.time, data.expected, data.clicked);
+        }, 300);
+        
+    } else if (data.result !== 'duplicate' &&
+               (data.result !== predicted || data.current_number !== expectedNumber)) {
+        // The server saw a different board; roll back (or forward) to its state
+        resyncBoard(data.current_number);
+    }
+}
+
+// Replace the local board state with the server's
+function resyncBoard(currentNumber) {
+    gameState.circles.forEach(circle => {
+        circle.clicked = circle.number < currentNumber;
+    });
+    gameState.currentNumber = currentNumber;
+    document.getElementById('next-number').textContent = currentNumber;
+    board.render();
+    
+    gameState.inputLocked = false;
+    if (!gameState.timerInterval) {
+        startTimer();
     }
 }
 
@@ -238,7 +296,7 @@ function stopTimer() {
 }
 
 // Show result screen
-function showResult(success, time, expectedNumber, clickedNumber) {
+function showResult(success, time, expectedNumber, clickedNumber, ranking) {
     const messageDiv = document.getElementById('result-message');
     
     if (success) {
@@ -247,6 +305,11 @@ function showResult(success, time, expectedNumber, clickedNumber) {
             <div style="font-size: 3rem; margin-bottom: 20px;">Congratulations!</div>
             <div>You completed all ${gameState.numbersCount} numbers in ${time} seconds!</div>
         `;
+        if (ranking) {
+            messageDiv.innerHTML += `
+                <div style="margin-top: 15px;">You ranked <strong>#${ranking.rank.toLocaleString()}</strong> of ${ranking.total.toLocaleString()}</div>
+            `;
+        }
     } else {
         messageDiv.className = 'result-message failure';
         messageDiv.innerHTML = `
@@ -262,53 +325,61 @@ function showResult(success, time, expectedNumber, clickedNumber) {
     loadLeaderboard('leaderboard-result');
 }
 
+// Subscribe to live leaderboard updates
+function connectLeaderboardStream() {
+    if (!window.EventSource) return;
+    
+    const source = new EventSource('/api/leaderboard/stream');
+    
+    // Sent on every (re)connect, so a dropped connection resyncs by itself
+    source.addEventListener('snapshot', event => {
+        leaderboardData = JSON.parse(event.data);
+        renderVisibleLeaderboards();
+    });
+    
+    // A new entry took a rank; boards are cut back to diff.size entries
+    source.addEventListener('leaderboard', event => {
+        if (!leaderboardData) return;
+        
+        const diff = JSON.parse(event.data);
+        const entries = leaderboardData[diff.numbers_count] || [];
+        entries.splice(diff.rank - 1, 0, diff.entry);
+        entries.length = Math.min(entries.length, diff.size);
+        leaderboardData[diff.numbers_count] = entries;
+        renderVisibleLeaderboards();
+    });
+    
+    // Fall back to fetching until the stream reconnects
+    source.addEventListener('error', () => {
+        leaderboardData = null;
+    });
+}
+
+// Re-render leaderboards on the screen being shown
+function renderVisibleLeaderboards() {
+    ['leaderboard-start', 'leaderboard-result'].forEach(elementId => {
+        const element = document.getElementById(elementId);
+        if (element.closest('.screen').classList.contains('active')) {
+            renderLeaderboard(elementId, leaderboardData);
+        }
+    });
+}
+
 // Load leaderboard
 async function loadLeaderboard(elementId) {
+    // The live stream already has the current leaderboard
+    if (leaderboardData) {
+        renderLeaderboard(elementId, leaderboardData);
+        return;
+    }
+    
     const leaderboardDiv = document.getElementById(elementId);
     
     try {
         // Fetch grouped leaderboard
         const response = await fetch('/api/leaderboard?grouped=true');
         const data = await response.json();
-        
-        // Check if there are any leaderboards
-        if (Object.keys(data).length === 0) {
-            leaderboardDiv.innerHTML = '<div class="loading">No records yet. Be the first!</div>';
-            return;
-        }
-        
-        let html = '';
-        
-        // Get circle counts and sort them numerically
-        const circleCounts = Object.keys(data).map(Number).sort((a, b) => a - b);
-        
-        // Display each circle count group
-        circleCounts.forEach(circleCount => {
-            const entries = data[circleCount];
-            
-            html += `<div class="leaderboard-group">`;
-            html += `<h3 class="leaderboard-group-title">${circleCount} Circles</h3>`;
-            
-            if (entries.length === 0) {
-                html += `<div class="leaderboard-empty">No records yet</div>`;
-            } else {
-                entries.forEach((entry, index) => {
-                    const rank = index + 1;
-                    
-                    html += `
-                        <div class="leaderboard-entry">
-                            <div class="leaderboard-rank">#${rank}</div>
-                            <div class="leaderboard-name">${entry.name}</div>
-                            <div class="leaderboard-time">${entry.time}s</div>
-                        </div>
-                    `;
-                });
-            }
-            
-            html += `</div>`;
-        });
-        
-        leaderboardDiv.innerHTML = html;
+        renderLeaderboard(elementId, data);
         
     } catch (error) {
         console.error('Error loading leaderboard:', error);
@@ -316,6 +387,50 @@ async function loadLeaderboard(elementId) {
     }
 }
 
+// Render a grouped leaderboard
+function renderLeaderboard(elementId, data) {
+    const leaderboardDiv = document.getElementById(elementId);
+    
+    // Check if there are any leaderboards
+    if (Object.keys(data).length === 0) {
+        leaderboardDiv.innerHTML = '<div class="loading">No records yet. Be the first!</div>';
+        return;
+    }
+    
+    let html = '';
+    
+    // Get circle counts and sort them numerically
+    const circleCounts = Object.keys(data).map(Number).sort((a, b) => a - b);
+    
+    // Display each circle count group
+    circleCounts.forEach(circleCount => {
+        const entries = data[circleCount];
+        
+        html += `<div class="leaderboard-group">`;
+        html += `<h3 class="leaderboard-group-title">${circleCount} Circles</h3>`;
+        
+        if (entries.length === 0) {
+            html += `<div class="leaderboard-empty">No records yet</div>`;
+        } else {
+            entries.forEach((entry, index) => {
+                const rank = index + 1;
+                
+                html += `
+                    <div class="leaderboard-entry">
+                        <div class="leaderboard-rank">#${rank}</div>
+                        <div class="leaderboard-name">${entry.name}</div>
+                        <div class="leaderboard-time">${entry.time}s</div>
+                    </div>
+                `;
+            });
+        }
+        
+        html += `</div>`;
+    });
+    
+    leaderboardDiv.innerHTML = html;
+}
+
 // Switch between screens
 function switchScreen(screenId) {
     document.querySelectorAll('.screen').forEach(screen => {
@@ -0,0 +1,203 @@
+"""
+Streaming completion-time statistics per circle count.
+
+Each circle count gets a DDSketch-style quantile sketch: completion times
+are counted in logarithmic buckets, so any quantile is answered within a
+fixed relative error and two sketches merge by adding bucket counts. The
+sketches are updated on every saved result and checkpointed to the
+database, so a restart only replays results saved after the checkpoint.
+"""
+
+import json
+import math
+from typing import Dict, List, Optional
+
+from consumer import ResultConsumer
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch)."""
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def _key(self, value: float) -> int:
+        """Bucket index for a positive value."""
+        return math.ceil(math.log(value) / self.log_gamma)
+    
+    def _value(self, key: int) -> float:
+        """Representative value of a bucket (within relative_accuracy)."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+    
+    def add(self, value: float, count: int = 1):
+        """Record a value."""
+        if value <= 0:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+    
+    def merge(self, other: 'QuantileSketch'):
+        """Fold another sketch with the same accuracy into this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.bins))
+    
+    def histogram(self, bin_width: float = 1.0) -> List[dict]:
+        """Approximate histogram with fixed-width bins.
+        
+        Returns:
+            List of {'start', 'end', 'count'} dictionaries in ascending order
+        """
+        counts: Dict[int, int] = {}
+        if self.zero_count:
+            counts[0] = self.zero_count
+        for key, count in self.bins.items():
+            index = int(self._value(key) // bin_width)
+            counts[index] = counts.get(index, 0) + count
+        return [
+            {
+                'start': round(index * bin_width, 2),
+                'end': round((index + 1) * bin_width, 2),
+                'count': counts[index]
+            }
+            for index in sorted(counts)
+        ]
+    
+    def to_dict(self) -> dict:
+        """Convert the sketch to a dictionary for JSON serialization."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'bins': {str(key): count for key, count in self.bins.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        """Rebuild a sketch from to_dict() output."""
+        sketch = cls(data['relative_accuracy'])
+        sketch.zero_count = data['zero_count']
+        sketch.bins = {int(key): count for key, count in data['bins'].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+class CircleCountStats:
+    """Running statistics for one circle count."""
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.times = QuantileSketch(relative_accuracy)
+        self.failed = 0
+    
+    def to_dict(self, histogram_bin_width: float = 1.0) -> dict:
+        """Summarize the statistics for the API."""
+        completed = self.times.count
+        games = completed + self.failed
+        return {
+            'games': games,
+            'completed': completed,
+            'failed': self.failed,
+            'failure_rate': round(self.failed / games, 4) if games else None,
+            'median': self._round(self.times.quantile(0.5)),
+            'p90': self._round(self.times.quantile(0.9)),
+            'p99': self._round(self.times.quantile(0.99)),
+            'histogram': self.times.histogram(histogram_bin_width)
+        }
+    
+    @staticmethod
+    def _round(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+
+class StatsService(ResultConsumer):
+    """Maintains per-circle-count sketches and checkpoints them to the database."""
+    
+    def __init__(self, db, relative_accuracy: float = 0.01,
+                 checkpoint_every: int = 100, checkpoint_interval: float = 60.0,
+                 settle_seconds: float = 0.0):
+        super().__init__(db, checkpoint_every, checkpoint_interval, settle_seconds)
+        self.relative_accuracy = relative_accuracy
+        self.stats: Dict[int, CircleCountStats] = {}
+    
+    def _get(self, numbers_count: int) -> CircleCountStats:
+        stats = self.stats.get(numbers_count)
+        if stats is None:
+            stats = self.stats[numbers_count] = CircleCountStats(self.relative_accuracy)
+        return stats
+    
+    def _restore(self) -> bool:
+        checkpoints = self.db.load_stats_checkpoints()
+        for numbers_count, payload, last_id in checkpoints:
+            data = json.loads(payload)
+            stats = self._get(numbers_count)
+            stats.times = QuantileSketch.from_dict(data['times'])
+            stats.failed = data['failed']
+            self.applied.update(data.get('applied', []))
+            self.last_result_id = max(self.last_result_id, last_id)
+        return bool(checkpoints)
+    
+    def _results_after(self, last_id: int):
+        for result_id, numbers_count, time_seconds, completed, timestamp in \
+                self.db.iter_results_after(last_id):
+            yield result_id, timestamp, (numbers_count, time_seconds, completed)
+    
+    def _apply(self, result_id: int, numbers_count: int, time_seconds: float,
+               completed: bool, notify: bool = True):
+        stats = self._get(numbers_count)
+        if completed:
+            stats.times.add(time_seconds)
+        else:
+            stats.failed += 1
+        self.pending += 1
+    
+    def _checkpoint_data(self):
+        applied = sorted(self.applied)
+        return [
+            (numbers_count,
+             json.dumps({'times': stats.times.to_dict(), 'failed': stats.failed,
+                         'applied': applied}),
+             self.last_result_id)
+            for numbers_count, stats in self.stats.items()
+        ]
+    
+    def _save_checkpoint(self, data):
+        self.db.save_stats_checkpoints(data)
+    
+    def summary(self, numbers_count: Optional[int] = None) -> dict:
+        """
+        Get statistics per circle count.
+        
+        Args:
+            numbers_count: Only include this circle count (None for all)
+            
+        Returns:
+            Dictionary mapping circle counts to their statistics
+        """
+        with self.lock:
+            if numbers_count is not None:
+                stats = self.stats.get(numbers_count)
+                return {numbers_count: stats.to_dict()} if stats else {}
+            return {count: self.stats[count].to_dict() for count in sorted(self.stats)}
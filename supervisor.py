@@ -0,0 +1,251 @@
+"""
+Run several web server processes on one host behind a shard-aware dispatcher.
+
+Each worker process runs main.py with its own SHARD_ID and keeps the games
+it started in local memory. The dispatcher sends /api/game/click to the
+worker encoded in the game ID and spreads every other request round-robin,
+so throughput scales with cores without sticky sessions or a shared store.
+
+    python supervisor.py --workers 4 --port 5000
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from sharding import shard_of
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Long-lived responses relayed as they arrive instead of buffered
+STREAMING_PATHS = {'/api/leaderboard/stream'}
+
+# Headers that apply to a single connection and must not be forwarded
+HOP_BY_HOP = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade'
+}
+
+
+class Cluster:
+    """Worker processes owned by the supervisor."""
+    
+    def __init__(self, workers: int, base_port: int, env: dict = None):
+        self.ports = [base_port + i for i in range(workers)]
+        self.env = env or {}
+        # Session cookies must verify on whichever worker serves the request
+        self.env.setdefault('SECRET_KEY', os.environ.get('SECRET_KEY') or secrets.token_hex(16))
+        self.processes: List[subprocess.Popen] = [None] * workers
+        self.stopping = False
+    
+    def _spawn(self, shard: int) -> subprocess.Popen:
+        env = dict(os.environ, **self.env)
+        env.update(PORT=str(self.ports[shard]), SHARD_ID=str(shard),
+                   SHARD_COUNT=str(len(self.ports)), FLASK_DEBUG='false')
+        return subprocess.Popen([sys.executable, os.path.join(APP_DIR, 'main.py')],
+                                cwd=os.getcwd(), env=env)
+    
+    def start(self):
+        """Start every worker."""
+        for shard in range(len(self.ports)):
+            self.processes[shard] = self._spawn(shard)
+    
+    def wait_ready(self, timeout: float = 30.0):
+        """Block until every worker answers HTTP requests."""
+        deadline = time.time() + timeout
+        for port in self.ports:
+            while True:
+                try:
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+                    conn.request('GET', '/')
+                    conn.getresponse().read()
+                    conn.close()
+                    break
+                except OSError:
+                    if time.time() > deadline:
+                        raise TimeoutError(f"Worker on port {port} did not start")
+                    time.sleep(0.05)
+    
+    def monitor(self, interval: float = 1.0):
+        """Restart workers that exit (their in-memory games are lost)."""
+        while not self.stopping:
+            for shard, process in enumerate(self.processes):
+                if process.poll() is not None and not self.stopping:
+                    print(f"Worker {shard} exited with {process.returncode}, restarting")
+                    self.processes[shard] = self._spawn(shard)
+            time.sleep(interval)
+    
+    def stop(self):
+        """Terminate every worker."""
+        self.stopping = True
+        for process in self.processes:
+            if process and process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            if process:
+                process.wait()
+
+
+def make_dispatcher(ports: List[int]):
+    """Build a request handler class that forwards to the given worker ports."""
+    round_robin = itertools.cycle(range(len(ports)))
+    local = threading.local()
+    
+    class Dispatcher(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; avoid Nagle delays
+        disable_nagle_algorithm = True
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def do_GET(self):
+            self.forward()
+        
+        def do_POST(self):
+            self.forward()
+        
+        def pick_shard(self, body: bytes):
+            """Owner shard for clicks, round-robin for everything else."""
+            if self.path.split('?')[0] == '/api/game/click':
+                try:
+                    game_id = json.loads(body).get('game_id')
+                except (ValueError, AttributeError):
+                    game_id = None
+                shard = shard_of(game_id)
+                if shard is None or shard >= len(ports):
+                    return None
+                return shard
+            return next(round_robin)
+        
+        def worker_connection(self, shard: int) -> http.client.HTTPConnection:
+            """Persistent connection to a worker, one per dispatcher thread."""
+            if not hasattr(local, 'connections'):
+                local.connections = {}
+            conn = local.connections.get(shard)
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', ports[shard], timeout=30)
+                local.connections[shard] = conn
+            return conn
+        
+        def forward(self):
+            length = int(self.headers.get('Content-Length', 0) or 0)
+            body = self.rfile.read(length) if length else b''
+            
+            shard = self.pick_shard(body)
+            if shard is None:
+                self.reply(404, b'{"error": "Game not found"}',
+                           [('Content-Type', 'application/json')])
+                return
+            
+            headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+            if self.path.split('?')[0] in STREAMING_PATHS:
+                self.relay_stream(shard, headers)
+                return
+            
+            for attempt in range(2):
+                conn = self.worker_connection(shard)
+                try:
+                    conn.request(self.command, self.path, body, headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                    break
+                except (OSError, http.client.HTTPException):
+                    # Stale keep-alive connection or restarting worker: retry once
+                    conn.close()
+                    local.connections.pop(shard, None)
+                    if attempt:
+                        self.reply(502, b'{"error": "Worker unavailable"}',
+                                   [('Content-Type', 'application/json')])
+                        return
+            
+            self.reply(response.status, data,
+                       [(k, v) for k, v in response.getheaders()
+                        if k.lower() not in HOP_BY_HOP and k.lower() != 'content-length'])
+        
+        def relay_stream(self, shard: int, headers: dict):
+            """Relay a streaming response chunk by chunk on its own connection."""
+            conn = http.client.HTTPConnection('127.0.0.1', ports[shard], timeout=None)
+            try:
+                conn.request(self.command, self.path, headers=headers)
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self.reply(502, b'{"error": "Worker unavailable"}',
+                           [('Content-Type', 'application/json')])
+                return
+            
+            # No Content-Length: the end of the stream is the end of the connection
+            self.close_connection = True
+            self.send_response(response.status)
+            for key, value in response.getheaders():
+                if key.lower() not in HOP_BY_HOP and key.lower() != 'content-length':
+                    self.send_header(key, value)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            try:
+                while True:
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+            except (OSError, http.client.HTTPException):
+                pass
+            finally:
+                conn.close()
+        
+        def reply(self, status: int, data: bytes, headers):
+            self.send_response(status)
+            for key, value in headers:
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return Dispatcher
+
+
+def serve(workers: int, port: int, worker_base_port: int, env: dict = None,
+          ready: threading.Event = None):
+    """Start the workers and run the dispatcher until interrupted."""
+    cluster = Cluster(workers, worker_base_port, env=env)
+    cluster.start()
+    server = None
+    try:
+        cluster.wait_ready()
+        threading.Thread(target=cluster.monitor, name="monitor", daemon=True).start()
+        server = ThreadingHTTPServer(('0.0.0.0', port), make_dispatcher(cluster.ports))
+        server.daemon_threads = True
+        print(f"Dispatching port {port} to {workers} workers on ports {cluster.ports}")
+        if ready:
+            ready.set()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.server_close()
+        cluster.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run sharded web server workers behind a dispatcher.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)),
+                        help="dispatcher port (default: 5000)")
+    parser.add_argument('--worker-base-port', type=int, default=5100,
+                        help="port of worker 0; worker N listens on base + N (default: 5100)")
+    args = parser.parse_args()
+    
+    serve(args.workers, args.port, args.worker_base_port)